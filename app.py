@@ -25,6 +25,7 @@
 #   - session_state['processing_started'] is set True when phase 3 submit is clicked.
 #   - session_state['submission_id'] is generated once; background thread not restarted.
 
+import hashlib
 import os
 import threading
 import time
@@ -162,17 +163,74 @@ def run_background_processing(full_data, pdf_filename, progress):
         progress['step_label'] = "Generating your application PDF…"
         print(f"SUBMISSION {sub_id}: BG STEP 1 – Generating PDF")
         try:
-            from application_pdf_generator import generate_application_pdf
-            pdf_buffer = generate_application_pdf(full_data)
+            # Rendered in a worker process so CPU-bound PDF work doesn't
+            # compete with the Streamlit server for the GIL
+            from application_pdf_cache import get_pdf_cache_stats
+            from application_pdf_generator import resolve_template
+            from application_pdf_pool import render_pdf
+            from config_secrets import get_template_config
+
+            # Record which template (event/year/version) the PDF was built
+            # from; it is written to the sheet with the application
+            template_config = get_template_config()
+            full_data['pdf_template'] = resolve_template(
+                event=template_config['event'], year=template_config['year'],
+            )['id']
+            print(f"SUBMISSION {sub_id}: PDF template {full_data['pdf_template']}")
+
+            pdf_buffer = render_pdf(full_data)
             if pdf_buffer:
                 status['pdf'] = True
-                print(f"SUBMISSION {sub_id}: PDF generated")
+                cache = get_pdf_cache_stats()
+                print(f"SUBMISSION {sub_id}: PDF generated (cache: {cache['memory_hits'] + cache['disk_hits']} hits, "
+                      f"{cache['misses']} misses, {cache['entries']} entries)")
             else:
                 print(f"SUBMISSION {sub_id}: PDF generation returned None (template missing?)")
         except Exception as e:
             print(f"SUBMISSION {sub_id}: PDF error – {e}")
             print(traceback.format_exc())
 
+        # Shrink PDF resumes (scans are often 10-20 MB of page images)
+        # before they are merged, uploaded or emailed
+        resume_bytes = full_data.get('resume_bytes')
+        # A resubmitted resume is recognized by the file as uploaded: the
+        # optimized copy comes out with different bytes every time
+        resume_digest = hashlib.sha256(resume_bytes).hexdigest() if resume_bytes else None
+        if resume_bytes:
+            try:
+                from application_pdf_pool import prepare_resume
+                resume_bytes, resume_report = prepare_resume(resume_bytes)
+                full_data['resume_bytes'] = resume_bytes
+                full_data['resume_original_size'] = resume_report['original_size']
+                full_data['resume_final_size'] = resume_report['final_size']
+                print(f"SUBMISSION {sub_id}: Resume {resume_report['original_size'] / 1024:.0f} KB -> "
+                      f"{resume_report['final_size'] / 1024:.0f} KB ({resume_report['method']}, "
+                      f"{resume_report['seconds']:.1f}s)")
+            except Exception as e:
+                print(f"SUBMISSION {sub_id}: Resume optimization error, using the original – {e}")
+                print(traceback.format_exc())
+
+        # Packet mode: a PDF resume is appended to the application PDF, so a
+        # single file is uploaded, emailed and offered for download
+        resume_in_packet = False
+        if pdf_buffer and resume_bytes:
+            try:
+                from application_pdf_generator import PDF_PACKET_MODE
+                if PDF_PACKET_MODE:
+                    from application_pdf_pool import render_packet
+                    packet_buffer = render_packet(pdf_buffer, resume_bytes)
+                    if packet_buffer:
+                        pdf_buffer = packet_buffer
+                        resume_in_packet = True
+                        status['packet'] = True
+                        print(f"SUBMISSION {sub_id}: Resume merged into the application PDF")
+                    else:
+                        print(f"SUBMISSION {sub_id}: Resume kept as a separate file")
+            except Exception as e:
+                print(f"SUBMISSION {sub_id}: Packet error, keeping two files – {e}")
+                print(traceback.format_exc())
+        full_data['resume_in_packet'] = resume_in_packet
+
         progress['pdf_buffer'] = pdf_buffer
 
         # ---- STEP 2: Upload PDF + resume to Google Drive + save to Sheets --
@@ -180,44 +238,71 @@ def run_background_processing(full_data, pdf_filename, progress):
         progress['step_label'] = "Saving your application to our database…"
         print(f"SUBMISSION {sub_id}: BG STEP 2 – Drive upload + Sheets")
 
-        pdf_link = ""
-        if pdf_buffer:
+        def upload_application_pdf():
             try:
-                from application_sheets_manager import upload_pdf_to_drive
-                pdf_link = upload_pdf_to_drive(pdf_buffer, pdf_filename)
-                if pdf_link:
-                    status['drive'] = True
-                    print(f"SUBMISSION {sub_id}: PDF uploaded to Drive")
+                from application_sheets_manager import drive_folder_name, upload_pdf_to_drive
+                return upload_pdf_to_drive(pdf_buffer, pdf_filename, folder=drive_folder_name(full_data))
             except Exception as e:
                 print(f"SUBMISSION {sub_id}: Drive upload failed – {e}")
                 print(traceback.format_exc())
+                return ""
 
-        # Upload resume if one was provided
-        resume_bytes = full_data.get('resume_bytes')
-        if resume_bytes:
+        def upload_resume():
             try:
-                import io as _io
-                from application_sheets_manager import upload_pdf_to_drive
+                # A resume already in Drive (the same file uploaded again,
+                # e.g. a resubmission) gets the existing file's link
+                from application_sheets_manager import drive_folder_name, upload_resume_to_drive
                 first = full_data.get('first_name', 'Applicant')
                 last  = full_data.get('last_name', '')
                 orig_ext = (full_data.get('resume_filename') or 'resume.pdf').rsplit('.', 1)[-1]
                 resume_drive_name = f"{first} {last} - Resume.{orig_ext}"
-                resume_buf = _io.BytesIO(resume_bytes)
                 resume_mime_type = full_data.get('resume_mime') or 'application/octet-stream'
-                resume_link = upload_pdf_to_drive(resume_buf, resume_drive_name, mimetype=resume_mime_type)
-                if resume_link:
-                    status['resume_drive'] = True
-                    print(f"SUBMISSION {sub_id}: Resume uploaded to Drive")
+                return upload_resume_to_drive(
+                    resume_bytes, resume_drive_name, mimetype=resume_mime_type, folder=drive_folder_name(full_data),
+                    digest=resume_digest,
+                )
             except Exception as e:
                 print(f"SUBMISSION {sub_id}: Resume upload failed – {e}")
                 print(traceback.format_exc())
+                return ""
+
+        # The PDF and the resume (if one was provided and isn't already in
+        # the packet) upload at the same time, each on its own pooled Drive
+        # client, so step 2 waits for the slower one rather than both
+        from concurrent.futures import ThreadPoolExecutor
+        drive_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"drive-{sub_id}") as uploads:
+            pdf_upload = uploads.submit(upload_application_pdf) if pdf_buffer else None
+            resume_upload = uploads.submit(upload_resume) if resume_bytes and not resume_in_packet else None
+
+            pdf_link = pdf_upload.result() if pdf_upload else ""
+            if pdf_link:
+                status['drive'] = True
+                print(f"SUBMISSION {sub_id}: PDF uploaded to Drive")
+
+            resume_link = resume_upload.result() if resume_upload else ""
+            if resume_link:
+                status['resume_drive'] = True
+                print(f"SUBMISSION {sub_id}: Resume uploaded to Drive")
+        if pdf_upload or resume_upload:
+            print(f"SUBMISSION {sub_id}: Drive uploads took {time.perf_counter() - drive_start:.2f}s")
 
         full_data['pdf_link'] = pdf_link
 
         try:
-            from application_sheets_manager import send_application_to_sheet
+            # Queued for the batched writer, which appends rows from
+            # concurrent submissions in one API call
+            from application_sheets_manager import get_sheet_writer_stats, send_application_to_sheet
             status['sheets'] = send_application_to_sheet(full_data)
-            print(f"SUBMISSION {sub_id}: Sheets write {'ok' if status.get('sheets') else 'failed'}")
+            writer = get_sheet_writer_stats()
+            print(f"SUBMISSION {sub_id}: Sheets write {'ok' if status.get('sheets') else 'failed'} "
+                  f"({writer['rows']} rows in {writer['batches']} batches so far)")
+            from application_api_limiter import get_api_limiter_stats
+            for api, limiter in get_api_limiter_stats().items():
+                if limiter['waits'] or limiter['retries'] or limiter['rejected']:
+                    print(f"SUBMISSION {sub_id}: Google {api} rate limit – {limiter['calls']} calls, "
+                          f"{limiter['waits']} waited (max {limiter['max_wait']:.1f}s), "
+                          f"{limiter['retries']} retries, {limiter['rejected']} rejected")
         except Exception as e:
             print(f"SUBMISSION {sub_id}: Sheets error – {e}")
             print(traceback.format_exc())
@@ -254,6 +339,7 @@ def run_background_processing(full_data, pdf_filename, progress):
 
         print(f"SUBMISSION {sub_id}: BACKGROUND COMPLETE")
         print(f"  PDF:     {status.get('pdf')}")
+        print(f"  Packet:  {status.get('packet')}")
         print(f"  Drive:   {status.get('drive')}")
         print(f"  Sheets:  {status.get('sheets')}")
         print(f"  BizMail: {status.get('company_email')}")
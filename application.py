@@ -13,11 +13,81 @@
 
 import streamlit as st
 from streamlit_drawable_canvas import st_canvas
+import os
 import datetime
 import base64
 import io
 from PIL import Image
 
+# Signature capture format:
+#   "vector" - keep the canvas strokes and draw them as PDF vector paths
+#   "raster" - encode the canvas bitmap as a PNG
+SIGNATURE_FORMAT = os.getenv("SIGNATURE_FORMAT", "vector").lower()
+SIGNATURE_CANVAS_WIDTH  = 400
+SIGNATURE_CANVAS_HEIGHT = 133
+
+# PIL mode for raster signatures: "L" (8-bit grayscale) or "1" (1-bit)
+SIGNATURE_RASTER_MODE = os.getenv("SIGNATURE_RASTER_MODE", "L")
+SIGNATURE_CROP_PADDING = 2
+
+
+def extract_signature_strokes(json_data):
+    """
+    Return the canvas' freehand strokes as compact path lists
+
+    Each stroke is {'width': stroke width, 'path': fabric.js path commands
+    such as ['M', x, y] / ['Q', x1, y1, x, y]} in canvas pixels, rounded to
+    0.1 px to keep session state small.
+    """
+    strokes = []
+    for obj in (json_data or {}).get('objects', []):
+        if obj.get('type') != 'path' or not obj.get('path'):
+            continue
+        strokes.append({
+            'width': obj.get('strokeWidth', 2),
+            'path': [[command[0]] + [round(v, 1) for v in command[1:]] for command in obj['path']],
+        })
+    return strokes
+
+
+def encode_signature_png(image_data):
+    """
+    Crop the canvas RGBA array to the ink and encode it as a compact PNG
+
+    The ink's bounding box comes from the alpha channel; the crop is
+    flattened onto white as grayscale (or 1-bit), so the PNG is a fraction
+    of the full 400x133 RGBA canvas and can be embedded without re-encoding.
+
+    Returns:
+        bytes: PNG data, or None if the canvas has no ink
+    """
+    import numpy as np
+
+    alpha = image_data[:, :, 3]
+    rows = np.flatnonzero(alpha.any(axis=1))
+    cols = np.flatnonzero(alpha.any(axis=0))
+    if not len(rows):
+        return None
+
+    height, width = alpha.shape
+    top    = max(rows[0] - SIGNATURE_CROP_PADDING, 0)
+    bottom = min(rows[-1] + 1 + SIGNATURE_CROP_PADDING, height)
+    left   = max(cols[0] - SIGNATURE_CROP_PADDING, 0)
+    right  = min(cols[-1] + 1 + SIGNATURE_CROP_PADDING, width)
+
+    crop = image_data[top:bottom, left:right].astype('float32')
+    coverage = crop[:, :, 3] / 255.0
+    ink = crop[:, :, :3].mean(axis=2)
+    gray = ink * coverage + 255.0 * (1.0 - coverage)
+
+    sig_img = Image.fromarray(gray.round().astype('uint8'), 'L')
+    if SIGNATURE_RASTER_MODE == '1':
+        sig_img = sig_img.convert('1')
+
+    sig_buffer = io.BytesIO()
+    sig_img.save(sig_buffer, format='PNG', optimize=True)
+    return sig_buffer.getvalue()
+
 
 def render_application_form(first_name_prefill='', last_name_prefill='', email_prefill=''):
     """Render the complete application form and return data when submitted"""
@@ -249,8 +319,8 @@ def render_application_form(first_name_prefill='', last_name_prefill='', email_p
         stroke_width=2,
         stroke_color="#000000",
         background_color="#FFFFFF",
-        height=133,
-        width=400,
+        height=SIGNATURE_CANVAS_HEIGHT,
+        width=SIGNATURE_CANVAS_WIDTH,
         drawing_mode="freedraw",
         key="legal_signature_canvas"
     )
@@ -383,17 +453,18 @@ def render_application_form(first_name_prefill='', last_name_prefill='', email_p
             return None
 
         # ---- Validate signature ----
-        has_signature    = False
-        signature_base64 = None
-        if canvas_result.image_data is not None:
-            import numpy as np
-            if np.any(canvas_result.image_data[:, :, 3] > 0):
-                has_signature = True
-                sig_img    = Image.fromarray(canvas_result.image_data.astype('uint8'), 'RGBA')
-                sig_buffer = io.BytesIO()
-                sig_img.save(sig_buffer, format='PNG')
-                sig_buffer.seek(0)
-                signature_base64 = base64.b64encode(sig_buffer.getvalue()).decode('utf-8')
+        has_signature     = False
+        signature_base64  = None
+        signature_strokes = None
+        if SIGNATURE_FORMAT == 'vector':
+            signature_strokes = extract_signature_strokes(canvas_result.json_data)
+            has_signature     = bool(signature_strokes)
+        # Raster capture (also the fallback when no strokes were reported)
+        if not has_signature and canvas_result.image_data is not None:
+            sig_png = encode_signature_png(canvas_result.image_data.astype('uint8'))
+            if sig_png:
+                has_signature    = True
+                signature_base64 = base64.b64encode(sig_png).decode('utf-8')
 
         if not has_signature:
             st.error("Please provide your signature")
@@ -447,6 +518,8 @@ def render_application_form(first_name_prefill='', last_name_prefill='', email_p
             'hs_completion':            hs_completion,
             'references':               references,
             'signature_base64':         signature_base64,
+            'signature_strokes':        signature_strokes,
+            'signature_size':           [SIGNATURE_CANVAS_WIDTH, SIGNATURE_CANVAS_HEIGHT],
             # scheduling fields (populated by application_scheduling if active)
             'location':                 st.session_state.get('selected_location', ''),
             'date':                     st.session_state.get('selected_date_value', ''),
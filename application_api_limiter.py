@@ -0,0 +1,228 @@
+# application_api_limiter.py
+# Client-side rate limiting and retries for Google API calls
+#
+# Google enforces per-minute quotas per project and per user; the service
+# account counts as one user.  Per Google's documented limits:
+#   Sheets - 60 read and 60 write requests per minute per user
+#            (300 per minute per project)
+#   Drive  - 12,000 queries per minute, but writes (uploads) are only
+#            sustained at about 3 per second per user
+# A request over quota fails with 429 (Drive: 403 userRateLimitExceeded),
+# and during a submission surge that used to lose the row or the upload.
+#
+# Every Google call goes through call_google_api() instead, which
+#   - takes a token from the API's bucket first (refilled continuously at
+#     the per-minute rate, holding at most GOOGLE_API_BURST tokens), waiting
+#     up to GOOGLE_API_MAX_WAIT seconds before rejecting the call
+#   - retries 429, rate-limit 403s and 5xx errors with exponential backoff
+#     and full jitter, honouring Retry-After; a 429 also pauses the bucket
+#     (for up to GOOGLE_API_MAX_WAIT), so other callers back off too
+# Waits, rejections and retries are counted per API (get_api_limiter_stats).
+#
+# No Streamlit imports: usable from CLI tools as well.
+
+import os
+import random
+import threading
+import time
+
+# Requests per minute per API bucket
+API_QUOTAS = {
+    'sheets_read': int(os.getenv("GOOGLE_SHEETS_READS_PER_MINUTE", "60")),
+    'sheets_write': int(os.getenv("GOOGLE_SHEETS_WRITES_PER_MINUTE", "60")),
+    'drive': int(os.getenv("GOOGLE_DRIVE_PER_MINUTE", "180")),
+}
+
+# Most requests let through back to back after an idle spell
+GOOGLE_API_BURST = int(os.getenv("GOOGLE_API_BURST", "10"))
+
+# Seconds a call may wait for a token before it is rejected
+GOOGLE_API_MAX_WAIT = float(os.getenv("GOOGLE_API_MAX_WAIT", "30"))
+
+# Retries after a quota or server error, and the backoff bounds in seconds
+GOOGLE_API_RETRIES = int(os.getenv("GOOGLE_API_RETRIES", "5"))
+GOOGLE_API_BACKOFF = float(os.getenv("GOOGLE_API_BACKOFF", "1"))
+GOOGLE_API_BACKOFF_MAX = float(os.getenv("GOOGLE_API_BACKOFF_MAX", "32"))
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded", "RATE_LIMIT_EXCEEDED")
+
+_buckets = {}   # api -> {'tokens', 'updated', 'paused_until'}
+_stats = {}     # api -> counters, see get_api_limiter_stats()
+_limiter_lock = threading.Lock()
+
+
+def _bucket(api):
+    """Bucket and counters of an API, created on first use (call with the lock held)"""
+    if api not in _buckets:
+        _buckets[api] = {'tokens': float(GOOGLE_API_BURST), 'updated': time.monotonic(), 'paused_until': 0.0}
+        _stats[api] = {
+            'calls': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'max_wait': 0.0,
+            'rejected': 0,
+            'retries': 0,
+            'throttled': 0,
+            'failed': 0,
+        }
+    return _buckets[api]
+
+
+def _reserve_token(api, cost=1):
+    """
+    Take cost tokens from the API's bucket, possibly going into debt
+
+    Returns:
+        float: Seconds the caller has to wait before using the token, or
+        None if that is longer than GOOGLE_API_MAX_WAIT (nothing taken)
+    """
+    rate = API_QUOTAS.get(api, 60) / 60
+    with _limiter_lock:
+        bucket = _bucket(api)
+        now = time.monotonic()
+        bucket['tokens'] = min(GOOGLE_API_BURST, bucket['tokens'] + (now - bucket['updated']) * rate)
+        bucket['updated'] = now
+
+        # Tokens keep refilling during a pause: the call goes at whichever ends later
+        wait = max(bucket['paused_until'] - now, (cost - bucket['tokens']) / rate, 0.0)
+        if wait > GOOGLE_API_MAX_WAIT:
+            _stats[api]['rejected'] += 1
+            return None
+
+        bucket['tokens'] -= cost
+        if wait > 0:
+            stats = _stats[api]
+            stats['waits'] += 1
+            stats['wait_seconds'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+        return wait
+
+
+def _pause(api, seconds):
+    """
+    Hold back every caller of an API for a while (after a 429), at most
+    GOOGLE_API_MAX_WAIT so that calls queued behind it are not rejected
+    """
+    seconds = min(seconds, GOOGLE_API_MAX_WAIT)
+    with _limiter_lock:
+        bucket = _bucket(api)
+        bucket['paused_until'] = max(bucket['paused_until'], time.monotonic() + seconds)
+        bucket['tokens'] = min(bucket['tokens'], 0.0)
+
+
+def error_status(error):
+    """HTTP status of a gspread APIError or googleapiclient HttpError, else None"""
+    response = getattr(error, 'response', None)     # gspread (requests)
+    if response is not None and getattr(response, 'status_code', None):
+        return response.status_code
+    resp = getattr(error, 'resp', None)             # googleapiclient (httplib2)
+    if resp is not None and getattr(resp, 'status', None):
+        return int(resp.status)
+    return None
+
+
+def _retry_after(error):
+    """Seconds from the error's Retry-After header, if it has one"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or getattr(error, 'resp', None) or {}
+    try:
+        value = headers.get('Retry-After') or headers.get('retry-after')
+        return max(0.0, float(value)) if value else None
+    except (AttributeError, TypeError, ValueError):
+        # HTTP-date form, or no headers
+        return None
+
+
+def is_quota_error(error):
+    """True for 429s and Drive's 403 rate-limit errors"""
+    status = error_status(error)
+    return status == 429 or (status == 403 and any(reason in str(error) for reason in _RATE_LIMIT_REASONS))
+
+
+def is_transport_error(error):
+    """True for failures below HTTP: dropped connections, timeouts, DNS and TLS errors"""
+    return isinstance(error, OSError) or type(error).__module__.startswith('httplib2')
+
+
+def is_retryable_error(error, idempotent=True):
+    """
+    True if a failed call may be sent again
+
+    Quota errors are always retryable (the request was not carried out).
+    Server errors only for idempotent calls: a 5xx on an append may still
+    have added the row.
+    """
+    if is_quota_error(error):
+        return True
+    return idempotent and error_status(error) in _RETRY_STATUSES
+
+
+def call_google_api(api, func, *args, idempotent=True, cost=1, **kwargs):
+    """
+    Call func(*args, **kwargs) under the API's rate limit, retrying quota
+    and server errors with backoff
+
+    Args:
+        api: Bucket name, a key of API_QUOTAS ('sheets_read', 'sheets_write', 'drive')
+        func: The API call, e.g. worksheet.append_rows or request.execute
+        idempotent: False if repeating the call after a 5xx could apply it twice
+        cost: Requests the call counts as against the quota (a batch of N counts N)
+
+    Returns:
+        Whatever func returns
+
+    Raises:
+        RuntimeError: No token became available within GOOGLE_API_MAX_WAIT
+        The API's own exception once retries are used up or for other errors
+    """
+    for attempt in range(GOOGLE_API_RETRIES + 1):
+        wait = _reserve_token(api, cost)
+        if wait is None:
+            raise RuntimeError(f"Google {api} rate limit: no request slot within {GOOGLE_API_MAX_WAIT:g}s")
+        if wait:
+            time.sleep(wait)
+
+        with _limiter_lock:
+            _stats[api]['calls'] += 1
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            quota = is_quota_error(e)
+            with _limiter_lock:
+                if quota:
+                    _stats[api]['throttled'] += 1
+                if attempt == GOOGLE_API_RETRIES or not is_retryable_error(e, idempotent):
+                    _stats[api]['failed'] += 1
+                    raise
+                _stats[api]['retries'] += 1
+
+            # Full jitter: anywhere up to the exponential bound
+            delay = _retry_after(e)
+            if delay is None:
+                delay = random.uniform(0, min(GOOGLE_API_BACKOFF_MAX, GOOGLE_API_BACKOFF * 2 ** attempt))
+            print(f">>> Google {api} call failed ({error_status(e)}), retry {attempt + 1} "
+                  f"of {GOOGLE_API_RETRIES} in {delay:.1f}s")
+            if quota:
+                _pause(api, delay)
+                if delay > GOOGLE_API_MAX_WAIT:
+                    # A Retry-After longer than the pause: this call waits out the rest itself
+                    time.sleep(delay)
+            else:
+                time.sleep(delay)
+
+
+def get_api_limiter_stats():
+    """
+    Counters per API, for sizing traffic against the quotas
+
+    Returns:
+        dict: api -> {calls, waits, wait_seconds, max_wait, avg_wait,
+              rejected, retries, throttled, failed, per_minute}
+    """
+    with _limiter_lock:
+        stats = {api: dict(counters) for api, counters in _stats.items()}
+    for api, counters in stats.items():
+        counters['avg_wait'] = counters['wait_seconds'] / counters['waits'] if counters['waits'] else 0.0
+        counters['per_minute'] = API_QUOTAS.get(api, 60)
+    return stats
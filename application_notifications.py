@@ -97,6 +97,11 @@ Reference {i+1}:
 
 def create_company_email_body(data):
     """Create the email body text for company notification"""
+    if data.get('resume_in_packet'):
+        attachment_note = "Application PDF is attached (the resume is included after the application pages)."
+    else:
+        attachment_note = "Application PDF is attached."
+
     email_body = f"""
 NEW EMPLOYMENT APPLICATION RECEIVED
 =====================================
@@ -165,7 +170,7 @@ SUBMISSION DETAILS:
   Reference ID: {data.get('submission_id', 'N/A')}
 
 =====================================
-Application PDF is attached.
+{attachment_note}
 """
     return email_body
 
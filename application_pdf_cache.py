@@ -0,0 +1,280 @@
+# application_pdf_cache.py
+# Content-addressed cache of generated application PDFs
+#
+# A reprocessing job (regenerate_pdfs.py) renders exactly the same PDFs again
+# on every run.  PDFs are cached by a SHA-256 key over
+# everything that determines their bytes: the sanitized field values, the
+# signature, the template (id and file hash), the fill engine and output
+# profile.
+# Identical input -> identical key -> the PDF is served without rendering.
+# The fields include the submission timestamp, so in the app a new
+# submission never hits; the cache pays off for re-runs of the same records.
+#
+# Tiers:
+#   memory - LRU bounded by PDF_CACHE_ENTRIES and PDF_CACHE_MB, off unless
+#            PDF_CACHE_ENTRIES is set (in the app it would only hold PII)
+#   disk   - optional, when PDF_CACHE_DIR is set; bounded by PDF_CACHE_DISK_MB,
+#            oldest files are deleted first.  The PDFs hold applicants'
+#            personal data, so only point it at private storage.
+#
+# The key also covers the compiled overlay layout file and the overlay
+# engine's text settings (OVERLAY_SETTINGS).  Bump PDF_CACHE_VERSION whenever
+# any other change to the generator alters its output for the same input, so
+# stale PDFs are not served.
+
+import hashlib
+import json
+import os
+import threading
+import traceback
+from collections import OrderedDict
+
+import application_pdf_generator as generator
+
+PDF_CACHE_VERSION = 2
+
+# Generator settings that decide how the overlay engine stamps text
+OVERLAY_SETTINGS = (
+    'OVERLAY_FONT',
+    'OVERLAY_DEFAULT_FONTSIZE',
+    'OVERLAY_MIN_FONTSIZE',
+    'OVERLAY_FLOOR_FONTSIZE',
+    'OVERLAY_PADDING',
+)
+
+# Memory tier limits (0 entries = off)
+PDF_CACHE_ENTRIES = int(os.getenv("PDF_CACHE_ENTRIES", "0"))
+PDF_CACHE_MB = float(os.getenv("PDF_CACHE_MB", "32"))
+
+# Optional disk tier (unset = memory only)
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "")
+PDF_CACHE_DISK_MB = float(os.getenv("PDF_CACHE_DISK_MB", "512"))
+
+# Check the disk tier's size after this many writes
+_DISK_PRUNE_EVERY = 20
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+_disk_writes = 0
+
+_stats = {
+    'memory_hits': 0,
+    'disk_hits': 0,
+    'misses': 0,
+    'stores': 0,
+    'evictions': 0,
+}
+
+# template or layout path -> (mtime, sha256)
+_template_versions = {}
+
+
+def _template_version(template_path):
+    """SHA-256 of a template (or layout) file, re-hashed only when its mtime changes"""
+    mtime = os.path.getmtime(template_path)
+    cached = _template_versions.get(template_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(template_path, "rb") as f:
+        version = hashlib.sha256(f.read()).hexdigest()
+    _template_versions[template_path] = (mtime, version)
+    return version
+
+
+def pdf_cache_key(request):
+    """
+    Cache key for a render request from application_pdf_pool.build_pdf_request()
+
+    Returns:
+        str: Hex SHA-256, or None if the template is missing or unknown (nothing to cache)
+    """
+    try:
+        template = generator.resolve_template(request.get('template'))
+        template_version = _template_version(template['path'])
+    except (OSError, ValueError):
+        return None
+    try:
+        layout_version = _template_version(template['layout'] or generator.default_layout_path(template['path']))
+    except OSError:
+        # No compiled layout: it is compiled from the template, hashed above
+        layout_version = None
+
+    signature = request['signature']
+    if signature and 'png' in signature:
+        # Raw image bytes are hashed rather than embedded in the JSON
+        signature = {'png_sha256': hashlib.sha256(signature['png']).hexdigest()}
+
+    material = {
+        'version': PDF_CACHE_VERSION,
+        'template': template['id'],
+        'template_sha256': template_version,
+        'layout_sha256': layout_version,
+        'overlay': {name: getattr(generator, name) for name in OVERLAY_SETTINGS},
+        'engine': (request.get('engine') or generator.PDF_ENGINE).lower(),
+        'profile': (request.get('profile') or generator.PDF_OUTPUT_PROFILE).lower(),
+        'fields': request['fields'],
+        'signature': signature,
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _disk_path(key):
+    return os.path.join(PDF_CACHE_DIR, key[:2], f"{key}.pdf")
+
+
+def _remember(key, pdf_bytes):
+    """Insert into the memory LRU and evict down to the limits; caller holds the lock"""
+    global _cache_bytes
+
+    if PDF_CACHE_ENTRIES <= 0 or len(pdf_bytes) > PDF_CACHE_MB * 1024 * 1024:
+        return
+
+    old = _cache.pop(key, None)
+    if old is not None:
+        _cache_bytes -= len(old)
+    _cache[key] = pdf_bytes
+    _cache_bytes += len(pdf_bytes)
+
+    while _cache and (len(_cache) > PDF_CACHE_ENTRIES or _cache_bytes > PDF_CACHE_MB * 1024 * 1024):
+        _, evicted = _cache.popitem(last=False)
+        _cache_bytes -= len(evicted)
+        _stats['evictions'] += 1
+
+
+def get_cached_pdf(key):
+    """
+    Look a PDF up in memory, then on disk
+
+    Returns:
+        bytes: The cached PDF, or None on a miss
+    """
+    if not key:
+        return None
+
+    with _cache_lock:
+        pdf_bytes = _cache.get(key)
+        if pdf_bytes is not None:
+            _cache.move_to_end(key)
+            _stats['memory_hits'] += 1
+            return pdf_bytes
+
+    if PDF_CACHE_DIR:
+        path = _disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf_bytes = f.read()
+            # Refresh the mtime so pruning removes the least recently used first
+            os.utime(path)
+        except FileNotFoundError:
+            pdf_bytes = None
+        except OSError as e:
+            print(f">>> WARNING: Could not read cached PDF {path}: {e}")
+            pdf_bytes = None
+
+        if pdf_bytes:
+            with _cache_lock:
+                _remember(key, pdf_bytes)
+                _stats['disk_hits'] += 1
+            return pdf_bytes
+
+    with _cache_lock:
+        _stats['misses'] += 1
+    return None
+
+
+def store_pdf(key, pdf_bytes):
+    """Add a freshly rendered PDF to the memory tier and, if enabled, the disk tier"""
+    global _disk_writes
+
+    if not key or not pdf_bytes:
+        return
+
+    with _cache_lock:
+        _remember(key, pdf_bytes)
+        _stats['stores'] += 1
+
+    if not PDF_CACHE_DIR:
+        return
+
+    path = _disk_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a reader never sees a partial file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f">>> WARNING: Could not write cached PDF {path}: {e}")
+        return
+
+    with _cache_lock:
+        _disk_writes += 1
+        prune = _disk_writes % _DISK_PRUNE_EVERY == 0
+    if prune:
+        prune_disk_cache()
+
+
+def prune_disk_cache():
+    """Delete the least recently used disk entries until under PDF_CACHE_DISK_MB"""
+    if not PDF_CACHE_DIR or not os.path.isdir(PDF_CACHE_DIR):
+        return 0
+
+    try:
+        files = []
+        for root, _, names in os.walk(PDF_CACHE_DIR):
+            for name in names:
+                if name.endswith(".pdf"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        limit = PDF_CACHE_DISK_MB * 1024 * 1024
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= limit:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+
+        if removed:
+            print(f">>> PDF cache: removed {removed} old files from {PDF_CACHE_DIR}")
+        return removed
+    except OSError as e:
+        print(f">>> WARNING: Could not prune PDF cache {PDF_CACHE_DIR}: {e}")
+        print(traceback.format_exc())
+        return 0
+
+
+def get_pdf_cache_stats():
+    """
+    Hit/miss counters and current memory usage
+
+    Returns:
+        dict: memory_hits, disk_hits, misses, stores, evictions, hit_rate,
+              entries, bytes, disk_enabled
+    """
+    with _cache_lock:
+        stats = dict(_stats)
+        stats['entries'] = len(_cache)
+        stats['bytes'] = _cache_bytes
+
+    lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+    stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else None
+    stats['disk_enabled'] = bool(PDF_CACHE_DIR)
+    return stats
+
+
+def clear_pdf_cache():
+    """Empty the memory tier and reset the counters (the disk tier is kept)"""
+    global _cache_bytes
+
+    with _cache_lock:
+        _cache.clear()
+        _cache_bytes = 0
+        for name in _stats:
+            _stats[name] = 0
@@ -3,66 +3,688 @@
 
 import io
 import os
+import codecs
+import json
 import base64
+import hashlib
+import threading
+import time
 import traceback
 import unicodedata
+from collections import OrderedDict
+
+# ------------------------------------------------------------------ #
+# CONFIGURATION
+# ------------------------------------------------------------------ #
+TEMPLATE_PATH = "application_template.pdf"
+
+# Compiled overlay layout for TEMPLATE_PATH (see compile_pdf_template.py)
+TEMPLATE_LAYOUT_PATH = "application_template_layout.json"
+
+# Templates for different events, years and form revisions are listed in
+# this JSON file (paths are relative to it; "layout" is optional):
+#   {"default_event": "job-fair",
+#    "templates": [
+#       {"event": "job-fair", "year": "2026", "version": 2,
+#        "path": "templates/job_fair_2026_v2.pdf"},
+#       {"event": "cafe", "year": "2026", "version": 1,
+#        "path": "templates/cafe_2026.pdf"}]}
+# Each is identified as "event/year/vN".  Without the file, TEMPLATE_PATH
+# is the only template: DEFAULT_TEMPLATE_EVENT for any year, version 1.
+PDF_TEMPLATE_REGISTRY = os.getenv("PDF_TEMPLATE_REGISTRY", "application_templates.json")
+DEFAULT_TEMPLATE_EVENT = "job-fair"
+
+# Parsed templates kept in memory per process; the least recently used
+# is dropped beyond this
+PDF_TEMPLATE_CACHE_SIZE = int(os.getenv("PDF_TEMPLATE_CACHE_SIZE", "4"))
+
+# Fill engine used by generate_application_pdf():
+#   "overlay" - stamp text onto a form-free copy of the template using the
+#               compiled layout; no AcroForm processing per submission
+#   "pymupdf" - single PyMuPDF pass: fill, place signature, bake the form
+#   "pdfrw"   - original pdfrw fill + fitz flatten path (kept for comparison)
+PDF_ENGINES = ("overlay", "pymupdf", "pdfrw")
+PDF_ENGINE = os.getenv("PDF_ENGINE", "overlay").lower()
+
+# How the finished PDF is written (it is uploaded, emailed and downloaded,
+# so every KB counts three times).  Selected with PDF_OUTPUT_PROFILE:
+#   "fast"     - deflate only (the original output)
+#   "compact"  - also drop unused and duplicate objects (identical images
+#                and fonts are stored once), pack objects into compressed
+#                object streams and subset embedded fonts to the glyphs used
+#   "smallest" - compact plus maximum compression effort and no XMP
+#                metadata; slower to save
+#   "preview"  - compact, but linearized for fast first-page display
+#                instead of using object streams (the two are exclusive);
+#                MuPDF 1.26+ no longer linearizes, so there it is saved
+#                without either
+PDF_OUTPUT_PROFILES = {
+    "fast": {"deflate": True},
+    "compact": {"garbage": 4, "deflate": True, "use_objstms": True, "subset_fonts": True},
+    "smallest": {
+        "garbage": 4, "deflate": True, "use_objstms": True, "subset_fonts": True,
+        "compression_effort": 100, "strip_metadata": True,
+    },
+    "preview": {"garbage": 4, "deflate": True, "subset_fonts": True, "linear": True},
+}
+PDF_OUTPUT_PROFILE = os.getenv("PDF_OUTPUT_PROFILE", "compact").lower()
+
+# Packet mode: append a PDF resume's pages to the application PDF so it is
+# uploaded and emailed as one file (non-PDF resumes stay separate files)
+PDF_PACKET_MODE = os.getenv("PDF_PACKET_MODE", "false").lower() == "true"
+
+# Used only when the template has no signature field
+DEFAULT_SIGNATURE_RECT = (100, 650, 300, 700)
+
+# Size of the st_canvas signature pad in application.py; vector strokes are
+# scaled from this box into the signature rect
+SIGNATURE_CANVAS_SIZE = (400, 133)
+
+# Overlay text settings: fields with an automatic (0) font size use the
+# default, and text is shrunk to the minimum size to make it fit.  Text that
+# still does not fit is shrunk further, down to the floor size (logged),
+# before any of it is cut.
+OVERLAY_FONT = "helv"
+OVERLAY_DEFAULT_FONTSIZE = 11
+OVERLAY_MIN_FONTSIZE = 6
+OVERLAY_FLOOR_FONTSIZE = 3
+OVERLAY_PADDING = 2
+
+
+# ------------------------------------------------------------------ #
+# TEMPLATE REGISTRY
+# ------------------------------------------------------------------ #
+_template_registry = {'mtime': None, 'default_event': None, 'entries': None}
+_template_registry_lock = threading.Lock()
+
+
+def _registry_entry(item, base_dir):
+    """Normalize one registry item into {id, event, year, version, path, layout}"""
+    event = str(item['event'])
+    year = str(item.get('year') or '')
+    version = int(item.get('version', 1))
+    layout = item.get('layout')
+    return {
+        'id': f"{event}/{year or 'any'}/v{version}",
+        'event': event,
+        'year': year,
+        'version': version,
+        'path': os.path.join(base_dir, item['path']),
+        'layout': os.path.join(base_dir, layout) if layout else None,
+    }
+
+
+def get_template_registry():
+    """
+    Return the registered templates, re-reading the registry file if it changed
+
+    Returns:
+        tuple: (default event, list of template entries)
+    """
+    try:
+        mtime = os.path.getmtime(PDF_TEMPLATE_REGISTRY)
+    except OSError:
+        mtime = None
+
+    with _template_registry_lock:
+        if _template_registry['entries'] is not None and _template_registry['mtime'] == mtime:
+            return _template_registry['default_event'], _template_registry['entries']
+
+        default_event = DEFAULT_TEMPLATE_EVENT
+        entries = None
+        if mtime is not None:
+            try:
+                with open(PDF_TEMPLATE_REGISTRY, "r", encoding="utf-8") as f:
+                    registry = json.load(f)
+                base_dir = os.path.dirname(PDF_TEMPLATE_REGISTRY)
+                entries = [_registry_entry(item, base_dir) for item in registry['templates']]
+                if not entries:
+                    raise ValueError("no templates listed")
+                default_event = str(registry.get('default_event') or entries[0]['event'])
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f">>> WARNING: Could not read template registry {PDF_TEMPLATE_REGISTRY}, "
+                      f"using {TEMPLATE_PATH} only: {e}")
+                default_event, entries = DEFAULT_TEMPLATE_EVENT, None
+
+        if entries is None:
+            entries = [_registry_entry(
+                {'event': DEFAULT_TEMPLATE_EVENT, 'path': TEMPLATE_PATH, 'layout': TEMPLATE_LAYOUT_PATH}, '',
+            )]
+
+        _template_registry.update(mtime=mtime, default_event=default_event, entries=entries)
+        return default_event, entries
+
+
+def resolve_template(template=None, event=None, year=None):
+    """
+    Pick a registered template
+
+    Args:
+        template: Template id ("event/year/vN"); takes precedence over event/year
+        event: Event name; defaults to the registry's default event
+        year: Year (e.g. the worksheet name); defaults to the latest registered.
+              Templates registered without a year match any year.
+
+    Returns:
+        dict: Template entry with id, event, year, version, path and layout
+
+    Raises:
+        ValueError: If a template id is given that is not registered
+    """
+    default_event, entries = get_template_registry()
+
+    if template:
+        for entry in entries:
+            if entry['id'] == template:
+                return dict(entry)
+        raise ValueError(f"Unknown PDF template '{template}'")
+
+    event = event or default_event
+    year = str(year) if year else ''
+    candidates = [
+        entry for entry in entries
+        if entry['event'] == event and (not year or entry['year'] in (year, ''))
+    ]
+    if not candidates:
+        print(f">>> WARNING: No PDF template registered for {event} {year or ''}".rstrip() + ", using the default")
+        candidates = [entry for entry in entries if entry['event'] == default_event] or entries
+
+    # Exact year first, then the latest year, then the highest version
+    best = max(candidates, key=lambda entry: (entry['year'] == year, entry['year'], entry['version']))
+    return dict(best)
+
+
+# ------------------------------------------------------------------ #
+# TEMPLATE CACHE
+# ------------------------------------------------------------------ #
+# Templates are parsed once per process and every submission fills its
+# own private copy.  A cached entry is rebuilt whenever its file's mtime
+# changes on disk; up to PDF_TEMPLATE_CACHE_SIZE templates are kept, so
+# switching between events doesn't re-parse per submission.
+_template_cache = OrderedDict()
+_template_cache_lock = threading.Lock()
+
+
+def _clone_pdf_object(obj, memo):
+    """Copy a pdfrw object tree, preserving shared and cyclic references"""
+    from pdfrw import PdfArray, PdfDict
+
+    if id(obj) in memo:
+        return memo[id(obj)]
+
+    if isinstance(obj, PdfDict):
+        clone = PdfDict()
+        clone.indirect = obj.indirect
+        memo[id(obj)] = clone
+        if obj.stream is not None:
+            clone._stream = obj.stream
+        for key, value in obj.iteritems():
+            dict.__setitem__(clone, key, _clone_pdf_object(value, memo))
+        return clone
+
+    if isinstance(obj, PdfArray):
+        clone = PdfArray()
+        clone.indirect = obj.indirect
+        memo[id(obj)] = clone
+        clone.extend(_clone_pdf_object(value, memo) for value in obj)
+        return clone
+
+    # Names, strings and numbers are immutable and can be shared
+    return obj
+
+
+def _load_template(template_path):
+    """
+    Return the cached template entry, re-reading it if the file changed
+
+    The entry holds the raw template bytes, an index of field name ->
+    [(page number, widget xref)] and the signature field's (page, rect).
+    """
+    import fitz
+
+    mtime = os.path.getmtime(template_path)
+
+    with _template_cache_lock:
+        entry = _template_cache.get(template_path)
+        if entry and entry['mtime'] == mtime:
+            _template_cache.move_to_end(template_path)
+            return entry
+
+        print(f">>> Parsing PDF template {template_path}...")
+        with open(template_path, "rb") as f:
+            template_bytes = f.read()
+
+        # Index field name -> widgets so filling never has to walk every
+        # annotation on every page again.
+        widgets = {}
+        signature = None
+        with fitz.open(stream=template_bytes, filetype="pdf") as doc:
+            for page in doc:
+                for widget in page.widgets():
+                    if not widget.field_name:
+                        continue
+                    if signature is None and 'signature' in widget.field_name.lower():
+                        rect = widget.rect
+                        if rect and rect.is_valid and not rect.is_empty:
+                            signature = (page.number, tuple(rect))
+                        continue
+                    if widget.field_type == fitz.PDF_WIDGET_TYPE_TEXT:
+                        widgets.setdefault(widget.field_name, []).append((page.number, widget.xref))
+
+        entry = {
+            'mtime': mtime,
+            'data': template_bytes,
+            'widgets': widgets,
+            'signature': signature,
+            'pdfrw': None,
+            'overlay': None,
+        }
+        _template_cache[template_path] = entry
+        _template_cache.move_to_end(template_path)
+        while len(_template_cache) > max(1, PDF_TEMPLATE_CACHE_SIZE):
+            evicted_path, _ = _template_cache.popitem(last=False)
+            print(f">>> Dropped parsed template {evicted_path} from the cache")
+        return entry
+
+
+def get_template_copy(template_path):
+    """
+    Return a private, fillable pdfrw copy of the cached template
+
+    Returns:
+        tuple: (trailer, fields) where fields maps each field name to the
+        list of widget annotations in the copy that carry that name
+    """
+    from pdfrw import PdfReader
+
+    entry = _load_template(template_path)
+
+    with _template_cache_lock:
+        if entry['pdfrw'] is None:
+            # Cloning the freshly parsed reader resolves every indirect
+            # object, so the cached tree is never mutated by later copies.
+            trailer = _clone_pdf_object(PdfReader(fdata=entry['data']), {})
+
+            fields = {}
+            nodes = [trailer.Root.Pages]
+            while nodes:
+                node = nodes.pop()
+                if node.Kids:
+                    nodes.extend(node.Kids)
+                    continue
+                for annotation in node.Annots or []:
+                    if annotation.Subtype == "/Widget" and annotation.T:
+                        key = annotation.T
+                        key_name = str(key)[1:-1] if not isinstance(key, str) else key.strip("()")
+                        fields.setdefault(key_name, []).append(annotation)
+
+            entry['pdfrw'] = (trailer, fields)
+
+    cached_trailer, cached_fields = entry['pdfrw']
+    memo = {}
+    trailer = _clone_pdf_object(cached_trailer, memo)
+    fields = {
+        name: [memo[id(widget)] for widget in widgets]
+        for name, widgets in cached_fields.items()
+    }
+    return trailer, fields
+
+
+def open_template_document(template_path):
+    """
+    Open a private PyMuPDF document on the cached template bytes
+
+    Returns:
+        tuple: (doc, entry) where entry is the cached template entry
+    """
+    import fitz
+
+    entry = _load_template(template_path)
+    return fitz.open(stream=entry['data'], filetype="pdf"), entry
+
+
+# ------------------------------------------------------------------ #
+# TEMPLATE COMPILER
+# ------------------------------------------------------------------ #
+def default_layout_path(template_path):
+    """Compiled layout file that belongs to a template"""
+    _, entries = get_template_registry()
+    for entry in entries:
+        if entry['layout'] and os.path.normpath(entry['path']) == os.path.normpath(template_path):
+            return entry['layout']
+    if template_path == TEMPLATE_PATH:
+        return TEMPLATE_LAYOUT_PATH
+    return f"{os.path.splitext(template_path)[0]}_layout.json"
+
+
+def compile_template_layout(template_path):
+    """
+    Measure every field generate_application_pdf() fills in a template
+
+    Returns:
+        dict: JSON-serializable layout with the template's sha256, a
+        field name -> [{page, rect, fontsize, maxlen, multiline}] map and
+        the signature field's {page, rect} (None if the template has none)
+    """
+    import fitz
+
+    with open(template_path, "rb") as f:
+        template_bytes = f.read()
+
+    filled_names = set(build_pdf_field_values({}))
+    fields = {}
+    signature = None
+
+    with fitz.open(stream=template_bytes, filetype="pdf") as doc:
+        for page in doc:
+            for widget in page.widgets():
+                name = widget.field_name
+                if not name:
+                    continue
+                rect = [round(v, 2) for v in widget.rect]
+                if signature is None and 'signature' in name.lower():
+                    signature = {'page': page.number, 'rect': rect}
+                    continue
+                if name not in filled_names or widget.field_type != fitz.PDF_WIDGET_TYPE_TEXT:
+                    continue
+                fields.setdefault(name, []).append({
+                    'page': page.number,
+                    'rect': rect,
+                    'fontsize': widget.text_fontsize or OVERLAY_DEFAULT_FONTSIZE,
+                    'maxlen': widget.text_maxlen or 0,
+                    'multiline': bool(widget.field_flags & fitz.PDF_TX_FIELD_IS_MULTILINE),
+                })
+
+    return {
+        'template': os.path.basename(template_path),
+        'template_sha256': hashlib.sha256(template_bytes).hexdigest(),
+        'fields': fields,
+        'signature': signature,
+    }
+
+
+def _load_overlay(template_path):
+    """
+    Return (base_pdf_bytes, layout) for the overlay engine, cached per template
+
+    The compiled layout file is used when it matches the template's hash;
+    otherwise the layout is compiled in memory.  The base PDF is the
+    template with its (empty) form baked into page content, built once.
+    """
+    import fitz
+
+    entry = _load_template(template_path)
+
+    with _template_cache_lock:
+        if entry['overlay'] is None:
+            template_sha256 = hashlib.sha256(entry['data']).hexdigest()
+            layout = None
+            layout_path = default_layout_path(template_path)
+            if os.path.exists(layout_path):
+                with open(layout_path, "r", encoding="utf-8") as f:
+                    layout = json.load(f)
+                if layout.get('template_sha256') != template_sha256:
+                    print(f">>> WARNING: {layout_path} is stale, recompiling layout in memory")
+                    print(">>> Run: python compile_pdf_template.py")
+                    layout = None
+            if layout is None:
+                layout = compile_template_layout(template_path)
+
+            with fitz.open(stream=entry['data'], filetype="pdf") as doc:
+                doc.bake()
+                base_bytes = doc.tobytes(garbage=3, deflate=True)
+
+            entry['overlay'] = (base_bytes, layout)
+
+    return entry['overlay']
+
+
+_overlay_font = None
+
+
+def _get_overlay_font():
+    """Process-wide fitz.Font used for stamped text"""
+    global _overlay_font
+    if _overlay_font is None:
+        import fitz
+        _overlay_font = fitz.Font(OVERLAY_FONT)
+    return _overlay_font
+
+
+# Advance width at font size 1 of every character measured so far; fitz's
+# text_length() costs ~20us per character, which made truncating long
+# values quadratic
+_overlay_char_widths = {}
+
+
+def _char_widths(text, font):
+    """Per-character advance widths of text at font size 1"""
+    widths = _overlay_char_widths
+    try:
+        return [widths[char] for char in text]
+    except KeyError:
+        for char in set(text) - widths.keys():
+            widths[char] = font.text_length(char, fontsize=1)
+        return [widths[char] for char in text]
+
+
+def _textbox_may_fit(rect, text_width, space_width, fontsize, font):
+    """
+    False when text of this total width (at size 1) certainly overflows
+    fill_textbox() in rect at fontsize, so the attempt can be skipped
+
+    Mirrors fill_textbox's line height, first baseline and 0.2 * fontsize
+    margin; every line break may drop at most one space.
+    """
+    line_height = font.ascender - font.descender
+    if line_height <= 1:
+        line_height = 1.2
+    max_lines = int((rect.height - fontsize * font.ascender) / (fontsize * line_height)) + 1
+    if max_lines < 1:
+        return False
+    needed = (text_width - (max_lines - 1) * space_width) * fontsize
+    return needed <= max_lines * (rect.width - 0.2 * fontsize)
+
+
+def _cut_with_ellipsis(value, dropped):
+    """value shortened by at least dropped characters, ending in "..." """
+    return value[:max(0, len(value) - dropped - 3)].rstrip() + "..."
+
+
+def _stamp_field(writer, placement, value, font, field_name=''):
+    """
+    Append one field value to a page's TextWriter, shrinking it to fit
+
+    Text is shrunk to OVERLAY_MIN_FONTSIZE, then (logged) further down to
+    OVERLAY_FLOOR_FONTSIZE, single-line values also giving up the padding.
+    Only a value that does not fit even then is cut, ending in "..." and
+    logged, so nothing is dropped silently.
+    """
+    import fitz
+
+    if placement['maxlen']:
+        value = value[:placement['maxlen']]
+
+    rect = fitz.Rect(placement['rect'])
+    fontsize = placement['fontsize']
+
+    if placement['multiline']:
+        inner = rect + (OVERLAY_PADDING, OVERLAY_PADDING, -OVERLAY_PADDING, -OVERLAY_PADDING)
+        # Shrink until the widest word fits, so short values such as dates
+        # in narrow columns are not split mid-word (fill_textbox keeps a
+        # 0.2 * fontsize left margin; 0.98 absorbs rounding at the edge)
+        widest = max(sum(_char_widths(word, font)) for word in value.split()) + 0.2
+        if widest * fontsize > inner.width:
+            fontsize = max(OVERLAY_MIN_FONTSIZE, 0.98 * inner.width / widest)
+        text_width = sum(_char_widths(value, font))
+        space_width = _char_widths(' ', font)[0]
+        while fontsize >= OVERLAY_FLOOR_FONTSIZE:
+            if _textbox_may_fit(inner, text_width, space_width, fontsize, font):
+                try:
+                    writer.fill_textbox(inner, value, font=font, fontsize=fontsize, warn=False)
+                    if fontsize < OVERLAY_MIN_FONTSIZE:
+                        print(f">>> WARNING: Field '{field_name}' shrunk to {fontsize:.1f}pt to fit")
+                    return
+                except ValueError:
+                    pass
+            fontsize -= 1 if fontsize > OVERLAY_MIN_FONTSIZE else 0.5
+
+        # Too long even at the floor size: cut it, ending in "...", until
+        # every line fits (fill_textbox returns the lines it left out)
+        fontsize = OVERLAY_FLOOR_FONTSIZE
+        length = len(value)
+
+        def left_out(text):
+            try:
+                return fitz.TextWriter(writer.rect).fill_textbox(inner, text, font=font, fontsize=fontsize, warn=None)
+            except ValueError:
+                # Box too small for even one line
+                return [(text, 0)]
+
+        lines = left_out(value)
+        while lines and value:
+            shorter = _cut_with_ellipsis(value, sum(len(line) for line, _ in lines))
+            value = shorter if len(shorter) < len(value) else ''
+            lines = left_out(value)
+        if value:
+            writer.fill_textbox(inner, value, font=font, fontsize=fontsize, warn=None)
+        print(f">>> WARNING: Field '{field_name}' too long for its box, "
+              f"cut to {len(value)} of {length} characters")
+        return
+
+    # Shrink to the available width; below the minimum size reclaim the
+    # padding first, then keep shrinking down to the floor
+    padding = OVERLAY_PADDING
+    char_widths = _char_widths(value, font)
+    text_width = sum(char_widths)
+    if text_width * fontsize > rect.width - 2 * padding:
+        fontsize = (rect.width - 2 * padding) / text_width
+        if fontsize < OVERLAY_MIN_FONTSIZE:
+            padding = min(padding, 0.5)
+            fontsize = max(OVERLAY_FLOOR_FONTSIZE, (rect.width - 2 * padding) / text_width)
+            if text_width * fontsize > rect.width - 2 * padding:
+                # Too long even at the floor size: cut it, ending in "..."
+                length = len(value)
+                available = rect.width - 2 * padding - sum(_char_widths("...", font)) * fontsize
+                used = 0
+                for count, width in enumerate(char_widths):
+                    used += width
+                    if used * fontsize > available:
+                        value = value[:count].rstrip() + "..."
+                        break
+                print(f">>> WARNING: Field '{field_name}' too long for its box, "
+                      f"cut to {len(value)} of {length} characters")
+            else:
+                print(f">>> WARNING: Field '{field_name}' shrunk to {fontsize:.1f}pt to fit")
+
+    # Vertically centered baseline, matching PyMuPDF's widget appearances
+    baseline = rect.y0 + rect.height / 2 + 0.3 * fontsize
+    writer.append((rect.x0 + padding, baseline), value, font=font, fontsize=fontsize)
+
+
+# Replace common smart quotes and special characters
+_PDF_REPLACEMENTS = {
+    '\u2019': "'",  # Right single quote
+    '\u2018': "'",  # Left single quote
+    '\u201c': '"',  # Left double quote
+    '\u201d': '"',  # Right double quote
+    '\u2013': '-',  # En dash
+    '\u2014': '-',  # Em dash
+    '\u2026': '...',  # Ellipsis
+    '\u202c': '',   # Pop directional formatting (invisible)
+    '\u202a': '',   # Left-to-right embedding (invisible)
+    '\u202b': '',   # Right-to-left embedding (invisible)
+    '\u200b': '',   # Zero-width space (invisible)
+    '\u200c': '',   # Zero-width non-joiner (invisible)
+    '\u200d': '',   # Zero-width joiner (invisible)
+    '\ufeff': '',   # Zero-width no-break space (invisible)
+    '(': '[',
+    ')': ']',
+    '&': 'and',
+    ':': '-',
+    '\\': '/',
+}
+
+# One translation table holds every replacement (plus newline handling)
+_PDF_TRANSLATION = str.maketrans({**_PDF_REPLACEMENTS, '\n': ' / ', '\r': ''})
+
+# Joins field values for bulk sanitizing; left alone by every step below
+_BULK_SEPARATOR = '\x00'
+
+# Limit length to prevent overflow
+_MAX_FIELD_LENGTH = 500
+
+
+def _pdf_ascii_errors(error):
+    """
+    Encode error handler: map non-ASCII characters through the table
+
+    Characters with no entry are dropped, like encode('ascii', 'ignore').
+    """
+    text = error.object[error.start:error.end]
+    return ''.join(_PDF_TRANSLATION.get(ord(char)) or '' for char in text), error.end
+
+
+codecs.register_error('pdf_sanitize', _pdf_ascii_errors)
+
+
+def _to_pdf_ascii(value):
+    """
+    Normalize, replace and strip value down to ASCII
+
+    Non-ASCII characters are replaced while encoding, so translate() only
+    ever sees ASCII text and stays on CPython's fast path.
+    """
+    if not value.isascii():
+        # Normalize unicode to decompose special characters
+        value = unicodedata.normalize('NFKD', value)
+        # Strip to ASCII-compatible characters only (latin-1 safe)
+        # This removes any remaining problematic Unicode
+        value = value.encode('ascii', 'pdf_sanitize').decode('ascii')
+    return value.translate(_PDF_TRANSLATION)
+
+
+def _limit_length(value):
+    """Limit length to prevent overflow"""
+    if len(value) > _MAX_FIELD_LENGTH:
+        value = value[:_MAX_FIELD_LENGTH - 3] + "..."
+    return value
+
 
 def sanitize_for_pdf(value):
     """Clean value for PDF field insertion - removes ALL problematic characters"""
     if not isinstance(value, str):
         value = str(value)
     
-    # First, normalize unicode to decompose special characters
-    value = unicodedata.normalize('NFKD', value)
-    
-    # Replace common smart quotes and special characters
-    replacements = {
-        '\u2019': "'",  # Right single quote
-        '\u2018': "'",  # Left single quote
-        '\u201c': '"',  # Left double quote
-        '\u201d': '"',  # Right double quote
-        '\u2013': '-',  # En dash
-        '\u2014': '-',  # Em dash
-        '\u2026': '...',  # Ellipsis
-        '\u202c': '',   # Pop directional formatting (invisible)
-        '\u202a': '',   # Left-to-right embedding (invisible)
-        '\u202b': '',   # Right-to-left embedding (invisible)
-        '\u200b': '',   # Zero-width space (invisible)
-        '\u200c': '',   # Zero-width non-joiner (invisible)
-        '\u200d': '',   # Zero-width joiner (invisible)
-        '\ufeff': '',   # Zero-width no-break space (invisible)
-        '—': '-',
-        '–': '-',
-        ''': "'",
-        ''': "'",
-        '"': '"',
-        '"': '"',
-        '…': '...',
-        '(': '[',
-        ')': ']',
-        '&': 'and',
-        ':': '-',
-        '\\': '/',
-    }
-    
-    for old, new in replacements.items():
-        value = value.replace(old, new)
-    
-    # Remove newlines and carriage returns
-    value = value.replace('\n', ' / ').replace('\r', '')
-    
-    # Strip to ASCII-compatible characters only (latin-1 safe)
-    # This removes any remaining problematic Unicode
-    value = value.encode('ascii', 'ignore').decode('ascii')
+    value = _to_pdf_ascii(value)
     
     # Clean up multiple spaces
-    value = ' '.join(value.split())
+    return _limit_length(' '.join(value.split()))
+
+
+def sanitize_fields(values):
+    """
+    Sanitize a whole field name -> value dict in one call
+
+    The values are joined and cleaned as one string, then split back
+    apart; the result is identical to sanitize_for_pdf() on each value.
+    """
+    texts = [value if isinstance(value, str) else str(value) for value in values.values()]
     
-    # Limit length to prevent overflow
-    if len(value) > 500:
-        value = value[:497] + "..."
+    joined = _BULK_SEPARATOR.join(texts)
+    if joined.count(_BULK_SEPARATOR) != len(texts) - 1:
+        # A value contains the separator itself
+        return {name: sanitize_for_pdf(text) for name, text in zip(values, texts)}
     
-    return value.strip()
+    # Collapse whitespace across all fields at once; the separator is not
+    # whitespace, so at most one space is left on either side of it
+    joined = ' '.join(_to_pdf_ascii(joined).split())
+    
+    return {
+        name: _limit_length(text.strip())
+        for name, text in zip(values, joined.split(_BULK_SEPARATOR))
+    }
+
 
 def format_positions(positions):
     """Format positions dictionary into readable string"""
@@ -101,221 +723,482 @@ def format_positions(positions):
     
     return " | ".join(position_list) if position_list else "Not specified"
 
-def generate_application_pdf(data):
-    """Generate a filled PDF from the application data"""
-    print(">>> Entering generate_application_pdf()")
-    print(f">>> Applicant: {data.get('first_name')} {data.get('last_name')}")
-    
-    try:
-        # Import here to avoid issues if libraries aren't available
-        print(">>> Importing PDF libraries...")
-        from pdfrw import PdfObject, PdfName, PdfReader, PdfWriter
-        import fitz
-        from PIL import Image
-        print(">>> PDF libraries imported successfully")
+# ------------------------------------------------------------------ #
+# SIGNATURE
+# ------------------------------------------------------------------ #
+def get_signature(data):
+    """
+    Return the applicant's signature from application data, or None
+
+    Returns:
+        dict: {'strokes': [...], 'size': (w, h)} for vector strokes captured
+        from the canvas, or {'png': bytes} for a raster signature
+    """
+    strokes = data.get('signature_strokes')
+    if strokes:
+        return {'strokes': strokes, 'size': tuple(data.get('signature_size') or SIGNATURE_CANVAS_SIZE)}
+    if data.get('signature_base64'):
+        return {'png': base64.b64decode(data['signature_base64'])}
+    return None
+
+
+def _draw_signature_strokes(page, rect, signature):
+    """
+    Draw canvas strokes as PDF vector paths, scaled to fit rect
+
+    Strokes use the canvas' fabric.js path commands (M, L, Q, C) in canvas
+    pixels; the canvas box is scaled proportionally and centered in rect.
+    """
+    import fitz
+
+    canvas_width, canvas_height = signature['size']
+    scale = min(rect.width / canvas_width, rect.height / canvas_height)
+    offset_x = rect.x0 + (rect.width - canvas_width * scale) / 2
+    offset_y = rect.y0 + (rect.height - canvas_height * scale) / 2
+
+    def point(x, y):
+        return fitz.Point(offset_x + x * scale, offset_y + y * scale)
+
+    shape = page.new_shape()
+    for stroke in signature['strokes']:
+        current = None
+        for command in stroke['path']:
+            op, args = command[0], command[1:]
+            if op == 'M':
+                current = point(*args[0:2])
+            elif op == 'L' and current is not None:
+                end = point(*args[0:2])
+                shape.draw_line(current, end)
+                current = end
+            elif op == 'Q' and current is not None:
+                # Quadratic -> cubic Bezier with the same curve
+                control, end = point(*args[0:2]), point(*args[2:4])
+                shape.draw_bezier(
+                    current,
+                    current + (control - current) * (2 / 3),
+                    end + (control - end) * (2 / 3),
+                    end,
+                )
+                current = end
+            elif op == 'C' and current is not None:
+                end = point(*args[4:6])
+                shape.draw_bezier(current, point(*args[0:2]), point(*args[2:4]), end)
+                current = end
+        shape.finish(
+            color=(0, 0, 0),
+            width=stroke.get('width', 2) * scale,
+            closePath=False,
+            lineCap=1,
+            lineJoin=1,
+        )
+    shape.commit()
+
+
+def insert_signature(page, rect, signature):
+    """
+    Place a signature from get_signature() into rect on page
+
+    Raster signatures are embedded exactly as captured (application.py
+    already crops and compresses them), with no decode/re-encode here.
+    """
+    import fitz
+
+    rect = fitz.Rect(rect)
+    if 'strokes' in signature:
+        _draw_signature_strokes(page, rect, signature)
+    else:
+        page.insert_image(rect, stream=signature['png'], keep_proportion=True)
+
+
+def build_pdf_field_values(data):
+    """Map application data to sanitized PDF form field values"""
+    # Collect the raw values, then sanitize EVERYTHING in one bulk pass
+    pdf_data = {
+        # Basic info
+        "first_name": data.get('first_name', ''),
+        "last_name": data.get('last_name', ''),
+        "email": data.get('email', ''),
+        "phone": data.get('phone', ''),
+        "alternate_phone": data.get('alternate_phone', ''),
+        "dob": data.get('dob', ''),
+        "street_address": data.get('street_address', ''),
+        "city": data.get('city', ''),
+        "state": data.get('state', ''),
+        "zip": data.get('zip', ''),
         
-        template_path = "application_template.pdf"
+        # Schedule
+        "location": data.get('location', ''),
+        "date": data.get('date', ''),
+        "time_slot": data.get('time_slot', ''),
         
-        # Check if template exists
-        if not os.path.exists(template_path):
-            print(f">>> ERROR: PDF template not found at {template_path}")
-            print(">>> PDF generation skipped. Application will still be saved to Google Sheets.")
-            return None
+        # Position info
+        "positions": format_positions(data.get('positions', {})),
+        "schedule_preference": data.get('schedule_preference', ''),
+        "expected_payrate": data.get('expected_payrate', ''),
         
-        print(f">>> PDF template found at {template_path}")
+        # Availability
+        "availability_restrictions": data.get('availability_restrictions', ''),
+        "start_date": data.get('start_date', ''),
         
-        filled_path = "/tmp/filled_application.pdf"
-        output_buffer = io.BytesIO()
+        # About
+        "why_applying": data.get('why_applying', ''),
+        "special_training": data.get('special_training', ''),
         
-        ANNOT_KEY = "/Annots"
-        ANNOT_FIELD_KEY = "/T"
-        ANNOT_VAL_KEY = "/V"
-        SUBTYPE_KEY = "/Subtype"
-        WIDGET_SUBTYPE_KEY = "/Widget"
+        # Legal
+        "legally_entitled": data.get('legally_entitled', ''),
+        "perform_duties": data.get('perform_duties', ''),
+        "drug_test": data.get('drug_test', ''),
+        "background_check": data.get('background_check', ''),
+        "drivers_license": data.get('drivers_license', ''),
+        "reliable_transport": data.get('reliable_transport', ''),
+        "submission_timestamp": data.get('submission_timestamp', ''),
         
-        print(">>> Preparing PDF data...")
-        # Prepare data for PDF fields - sanitize EVERYTHING
-        pdf_data = {
-            # Basic info
-            "first_name": sanitize_for_pdf(data.get('first_name', '')),
-            "last_name": sanitize_for_pdf(data.get('last_name', '')),
-            "email": sanitize_for_pdf(data.get('email', '')),
-            "phone": sanitize_for_pdf(data.get('phone', '')),
-            "alternate_phone": sanitize_for_pdf(data.get('alternate_phone', '')),
-            "dob": sanitize_for_pdf(data.get('dob', '')),
-            "street_address": sanitize_for_pdf(data.get('street_address', '')),
-            "city": sanitize_for_pdf(data.get('city', '')),
-            "state": sanitize_for_pdf(data.get('state', '')),
-            "zip": sanitize_for_pdf(data.get('zip', '')),
-            
-            # Schedule
-            "location": sanitize_for_pdf(data.get('location', '')),
-            "date": sanitize_for_pdf(data.get('date', '')),
-            "time_slot": sanitize_for_pdf(data.get('time_slot', '')),
-            
-            # Position info
-            "positions": sanitize_for_pdf(format_positions(data.get('positions', {}))),
-            "schedule_preference": sanitize_for_pdf(data.get('schedule_preference', '')),
-            "expected_payrate": sanitize_for_pdf(data.get('expected_payrate', '')),
-            
-            # Availability
-            "availability_restrictions": sanitize_for_pdf(data.get('availability_restrictions', '')),
-            "start_date": sanitize_for_pdf(data.get('start_date', '')),
+        # Education
+        "college_name": data.get('college_name', ''),
+        "college_study": data.get('college_study', ''),
+        "college_graduated": data.get('college_graduated', ''),
+        "college_completion": data.get('college_completion', ''),
+        "hs_name": data.get('hs_name', ''),
+        "hs_study": data.get('hs_study', ''),
+        "hs_graduated": data.get('hs_graduated', ''),
+        "hs_completion": data.get('hs_completion', ''),
+    }
+    
+    # Add individual employer fields (up to 3 employers)
+    employers = data.get('employers', [])
+    for i in range(3):
+        emp_num = i + 1
+        if i < len(employers):
+            emp = employers[i]
+            pdf_data[f"employer{emp_num}_name"] = emp.get('employer', '')
+            pdf_data[f"employer{emp_num}_location"] = emp.get('location', '')
+            pdf_data[f"employer{emp_num}_hire"] = emp.get('hire_date', '')
+            pdf_data[f"employer{emp_num}_end"] = emp.get('end_date', '')
+            pdf_data[f"employer{emp_num}_position"] = emp.get('position', '')
+            pdf_data[f"employer{emp_num}_pay"] = emp.get('pay_rate', '')
+            pdf_data[f"employer{emp_num}_reason"] = emp.get('reason', '')
+        else:
+            pdf_data[f"employer{emp_num}_name"] = ''
+            pdf_data[f"employer{emp_num}_location"] = ''
+            pdf_data[f"employer{emp_num}_hire"] = ''
+            pdf_data[f"employer{emp_num}_end"] = ''
+            pdf_data[f"employer{emp_num}_position"] = ''
+            pdf_data[f"employer{emp_num}_pay"] = ''
+            pdf_data[f"employer{emp_num}_reason"] = ''
+    
+    # Add individual reference fields (up to 3 references)
+    references = data.get('references', [])
+    for i in range(3):
+        ref_num = i + 1
+        if i < len(references):
+            ref = references[i]
+            pdf_data[f"reference{ref_num}_name"] = ref.get('name', '')
+            pdf_data[f"reference{ref_num}_contact"] = ref.get('contact', '')
+            pdf_data[f"reference{ref_num}_relationship"] = ref.get('relationship', '')
+        else:
+            pdf_data[f"reference{ref_num}_name"] = ''
+            pdf_data[f"reference{ref_num}_contact"] = ''
+            pdf_data[f"reference{ref_num}_relationship"] = ''
+    
+    return sanitize_fields(pdf_data)
+
+def _render_with_pdfrw(pdf_data, signature, template_path):
+    """Original path: pdfrw sets /V values, then fitz re-opens and flattens"""
+    from pdfrw import PdfObject, PdfName, PdfWriter
+    import fitz
+    
+    print(">>> Copying cached PDF template...")
+    # Fill a private copy of the template parsed once per process
+    template_pdf, template_fields = get_template_copy(template_path)
+    
+    print(">>> Filling PDF fields...")
+    field_count = 0
+    for key_name, value in pdf_data.items():
+        # Double-check the value is clean
+        if not value:
+            continue
+        try:
+            # Test if it can be encoded as latin-1
+            value.encode('latin-1')
+        except UnicodeEncodeError as e:
+            print(f">>> WARNING: Field '{key_name}' still has encoding issues, skipping")
+            print(f">>> Problematic value: {repr(value[:100])}")
+            continue
+        for annotation in template_fields.get(key_name, []):
+            annotation[PdfName("V")] = PdfObject(f"({value})")
+            field_count += 1
+    
+    print(f">>> Filled {field_count} PDF fields")
+    
+    print(">>> Writing filled PDF to memory...")
+    # Kept in a per-call buffer (no shared temp file) so concurrent
+    # submissions can never overwrite each other's output.
+    filled_buffer = io.BytesIO()
+    PdfWriter(filled_buffer, trailer=template_pdf).write()
+    
+    print(">>> Flattening PDF with fitz...")
+    # Flatten and add signature
+    doc = fitz.open(stream=filled_buffer.getvalue(), filetype="pdf")
+    filled_buffer.close()
+    
+    # Add signature if present
+    signature_placed = False
+    
+    if signature:
+        print(">>> Adding signature to PDF...")
+        try:
+            # Try to find signature field first
+            for page_num, page in enumerate(doc):
+                widgets = page.widgets()
+                if widgets:
+                    for widget in widgets:
+                        if widget.field_name and 'signature' in widget.field_name.lower():
+                            # Get widget rectangle
+                            rect = widget.rect
+                            if rect and rect.is_valid and not rect.is_empty:
+                                insert_signature(page, rect, signature)
+                                signature_placed = True
+                                widget.field_flags |= 1 << 0  # Set ReadOnly
+                                widget.update()
+                                break
+                if signature_placed:
+                    break
             
-            # About
-            "why_applying": sanitize_for_pdf(data.get('why_applying', '')),
-            "special_training": sanitize_for_pdf(data.get('special_training', '')),
+            # If no signature field found, place on last page at default location
+            if not signature_placed:
+                page = doc[-1]
+                rect = fitz.Rect(DEFAULT_SIGNATURE_RECT)
+                
+                if rect and rect.is_valid and not rect.is_empty:
+                    insert_signature(page, rect, signature)
+                    signature_placed = True
             
-            # Legal
-            "legally_entitled": sanitize_for_pdf(data.get('legally_entitled', '')),
-            "perform_duties": sanitize_for_pdf(data.get('perform_duties', '')),
-            "drug_test": sanitize_for_pdf(data.get('drug_test', '')),
-            "background_check": sanitize_for_pdf(data.get('background_check', '')),
-            "drivers_license": sanitize_for_pdf(data.get('drivers_license', '')),
-            "reliable_transport": sanitize_for_pdf(data.get('reliable_transport', '')),
-            "submission_timestamp": sanitize_for_pdf(data.get('submission_timestamp', '')),
+            print(f">>> Signature placed: {signature_placed}")
             
-            # Education
-            "college_name": sanitize_for_pdf(data.get('college_name', '')),
-            "college_study": sanitize_for_pdf(data.get('college_study', '')),
-            "college_graduated": sanitize_for_pdf(data.get('college_graduated', '')),
-            "college_completion": sanitize_for_pdf(data.get('college_completion', '')),
-            "hs_name": sanitize_for_pdf(data.get('hs_name', '')),
-            "hs_study": sanitize_for_pdf(data.get('hs_study', '')),
-            "hs_graduated": sanitize_for_pdf(data.get('hs_graduated', '')),
-            "hs_completion": sanitize_for_pdf(data.get('hs_completion', '')),
-        }
-        
-        # Add individual employer fields (up to 3 employers)
-        employers = data.get('employers', [])
-        for i in range(3):
-            emp_num = i + 1
-            if i < len(employers):
-                emp = employers[i]
-                pdf_data[f"employer{emp_num}_name"] = sanitize_for_pdf(emp.get('employer', ''))
-                pdf_data[f"employer{emp_num}_location"] = sanitize_for_pdf(emp.get('location', ''))
-                pdf_data[f"employer{emp_num}_hire"] = sanitize_for_pdf(emp.get('hire_date', ''))
-                pdf_data[f"employer{emp_num}_end"] = sanitize_for_pdf(emp.get('end_date', ''))
-                pdf_data[f"employer{emp_num}_position"] = sanitize_for_pdf(emp.get('position', ''))
-                pdf_data[f"employer{emp_num}_pay"] = sanitize_for_pdf(emp.get('pay_rate', ''))
-                pdf_data[f"employer{emp_num}_reason"] = sanitize_for_pdf(emp.get('reason', ''))
+        except Exception as e:
+            print(f">>> Could not add signature to PDF: {e}")
+            print(traceback.format_exc())
+    
+    print(">>> Making all fields read-only...")
+    # Make all fields read-only
+    for page in doc:
+        widgets = page.widgets()
+        if widgets:
+            for widget in widgets:
+                widget.update()
+                widget.field_flags |= 1 << 0  # Set ReadOnly
+    
+    return doc
+
+
+def _render_with_pymupdf(pdf_data, signature, template_path):
+    """
+    Single-pass PyMuPDF path: fill, bake the form into page content, sign
+
+    Only widgets that actually receive a value are loaded and updated (via
+    the cached field index), and bake() replaces the second walk over every
+    widget that the pdfrw path needs to regenerate appearances.
+    """
+    print(">>> Opening cached PDF template...")
+    doc, template = open_template_document(template_path)
+    pages = [doc[i] for i in range(doc.page_count)]
+    
+    print(">>> Filling PDF fields...")
+    field_count = 0
+    for key_name, value in pdf_data.items():
+        if not value:
+            continue
+        try:
+            value.encode('latin-1')
+        except UnicodeEncodeError:
+            print(f">>> WARNING: Field '{key_name}' still has encoding issues, skipping")
+            print(f">>> Problematic value: {repr(value[:100])}")
+            continue
+        for page_num, xref in template['widgets'].get(key_name, []):
+            widget = pages[page_num].load_widget(xref)
+            widget.field_value = value
+            widget.update()
+            field_count += 1
+    
+    print(f">>> Filled {field_count} PDF fields")
+    
+    print(">>> Baking form fields into page content...")
+    doc.bake()
+    
+    if signature:
+        print(">>> Adding signature to PDF...")
+        try:
+            if template['signature']:
+                page_num, rect = template['signature']
             else:
-                pdf_data[f"employer{emp_num}_name"] = ''
-                pdf_data[f"employer{emp_num}_location"] = ''
-                pdf_data[f"employer{emp_num}_hire"] = ''
-                pdf_data[f"employer{emp_num}_end"] = ''
-                pdf_data[f"employer{emp_num}_position"] = ''
-                pdf_data[f"employer{emp_num}_pay"] = ''
-                pdf_data[f"employer{emp_num}_reason"] = ''
-        
-        # Add individual reference fields (up to 3 references)
-        references = data.get('references', [])
-        for i in range(3):
-            ref_num = i + 1
-            if i < len(references):
-                ref = references[i]
-                pdf_data[f"reference{ref_num}_name"] = sanitize_for_pdf(ref.get('name', ''))
-                pdf_data[f"reference{ref_num}_contact"] = sanitize_for_pdf(ref.get('contact', ''))
-                pdf_data[f"reference{ref_num}_relationship"] = sanitize_for_pdf(ref.get('relationship', ''))
+                page_num, rect = doc.page_count - 1, DEFAULT_SIGNATURE_RECT
+            insert_signature(doc[page_num], rect, signature)
+            print(">>> Signature placed: True")
+        except Exception as e:
+            print(f">>> Could not add signature to PDF: {e}")
+            print(traceback.format_exc())
+    
+    return doc
+
+
+def _render_with_overlay(pdf_data, signature, template_path):
+    """
+    Overlay path: stamp values onto a form-free copy of the template
+
+    Uses the compiled layout, so the per-submission cost depends only on
+    how many fields are filled, not on the form dictionary.
+    """
+    import fitz
+    
+    base_bytes, layout = _load_overlay(template_path)
+    doc = fitz.open(stream=base_bytes, filetype="pdf")
+    font = _get_overlay_font()
+    
+    print(">>> Stamping PDF fields...")
+    writers = {}
+    field_count = 0
+    for key_name, value in pdf_data.items():
+        if not value:
+            continue
+        try:
+            value.encode('latin-1')
+        except UnicodeEncodeError:
+            print(f">>> WARNING: Field '{key_name}' still has encoding issues, skipping")
+            print(f">>> Problematic value: {repr(value[:100])}")
+            continue
+        for placement in layout['fields'].get(key_name, []):
+            page_num = placement['page']
+            if page_num not in writers:
+                writers[page_num] = fitz.TextWriter(doc[page_num].rect)
+            _stamp_field(writers[page_num], placement, value, font, key_name)
+            field_count += 1
+    
+    # One content stream per page rather than one per field
+    for page_num, writer in writers.items():
+        writer.write_text(doc[page_num])
+    
+    print(f">>> Stamped {field_count} PDF fields")
+    
+    if signature:
+        print(">>> Adding signature to PDF...")
+        try:
+            if layout.get('signature'):
+                page_num, rect = layout['signature']['page'], layout['signature']['rect']
             else:
-                pdf_data[f"reference{ref_num}_name"] = ''
-                pdf_data[f"reference{ref_num}_contact"] = ''
-                pdf_data[f"reference{ref_num}_relationship"] = ''
-        
-        print(">>> Reading PDF template...")
-        # Read template and fill fields
-        template_pdf = PdfReader(template_path)
-        
-        print(">>> Filling PDF fields...")
-        field_count = 0
-        for page in template_pdf.pages:
-            annotations = page.get(ANNOT_KEY)
-            if annotations:
-                for annotation in annotations:
-                    if annotation.get(SUBTYPE_KEY) == WIDGET_SUBTYPE_KEY:
-                        key = annotation.get(ANNOT_FIELD_KEY)
-                        if key:
-                            key_name = str(key)[1:-1] if not isinstance(key, str) else key.strip("()")
-                            if key_name in pdf_data:
-                                value = pdf_data[key_name]
-                                # Double-check the value is clean
-                                if value:
-                                    try:
-                                        # Test if it can be encoded as latin-1
-                                        value.encode('latin-1')
-                                        annotation[PdfName("V")] = PdfObject(f"({value})")
-                                        field_count += 1
-                                    except UnicodeEncodeError as e:
-                                        print(f">>> WARNING: Field '{key_name}' still has encoding issues, skipping")
-                                        print(f">>> Problematic value: {repr(value[:100])}")
-        
-        print(f">>> Filled {field_count} PDF fields")
+                page_num, rect = doc.page_count - 1, DEFAULT_SIGNATURE_RECT
+            insert_signature(doc[page_num], rect, signature)
+            print(">>> Signature placed: True")
+        except Exception as e:
+            print(f">>> Could not add signature to PDF: {e}")
+            print(traceback.format_exc())
+    
+    return doc
+
+
+# Set to False the first time MuPDF rejects linear=True
+_linear_supported = None
+
+
+def save_pdf(doc, profile=None):
+    """
+    Write a finished document with an output profile
+
+    Args:
+        doc: Open fitz document (left open)
+        profile: Name from PDF_OUTPUT_PROFILES; defaults to PDF_OUTPUT_PROFILE
+
+    Returns:
+        tuple: (BytesIO, stats dict with profile, size in bytes and save seconds)
+    """
+    global _linear_supported
+    
+    profile = (profile or PDF_OUTPUT_PROFILE).lower()
+    if profile not in PDF_OUTPUT_PROFILES:
+        raise ValueError(f"Unknown PDF output profile '{profile}' (expected one of {', '.join(PDF_OUTPUT_PROFILES)})")
+    
+    options = dict(PDF_OUTPUT_PROFILES[profile])
+    subset_fonts = options.pop("subset_fonts", False)
+    strip_metadata = options.pop("strip_metadata", False)
+    if options.get("linear") and _linear_supported is False:
+        options.pop("linear")
+    
+    start = time.perf_counter()
+    if subset_fonts:
+        doc.subset_fonts()
+    if strip_metadata:
+        doc.del_xml_metadata()
+    
+    output_buffer = io.BytesIO()
+    try:
+        doc.save(output_buffer, **options)
+    except Exception as e:
+        if not options.pop("linear", False):
+            raise
+        # Newer MuPDF releases dropped linearization; save without it
+        print(f">>> WARNING: Linearization not supported, saving without it: {e}")
+        _linear_supported = False
+        output_buffer = io.BytesIO()
+        doc.save(output_buffer, **options)
+    
+    stats = {
+        'profile': profile,
+        'size': output_buffer.tell(),
+        'seconds': time.perf_counter() - start,
+    }
+    output_buffer.seek(0)
+    return output_buffer, stats
+
+
+def render_application_pdf(pdf_data, signature, engine=None, profile=None, template=None):
+    """
+    Render sanitized field values and a signature into a finished PDF
+
+    Args:
+        pdf_data: Field name -> value map from build_pdf_field_values()
+        signature: Signature from get_signature(), or None
+        engine: Fill engine name (see PDF_ENGINES); defaults to PDF_ENGINE
+        profile: Output profile (see PDF_OUTPUT_PROFILES); defaults to PDF_OUTPUT_PROFILE
+        template: Template id (see resolve_template()); defaults to the default event's latest
+
+    Returns:
+        BytesIO: The finished PDF, or None if generation failed
+    """
+    engine = (engine or PDF_ENGINE).lower()
+    
+    try:
+        if engine not in PDF_ENGINES:
+            raise ValueError(f"Unknown PDF engine '{engine}' (expected one of {', '.join(PDF_ENGINES)})")
         
-        print(">>> Writing filled PDF...")
-        PdfWriter(filled_path, trailer=template_pdf).write()
+        # Import here to avoid issues if libraries aren't available
+        print(">>> Importing PDF libraries...")
+        import fitz
+        print(">>> PDF libraries imported successfully")
         
-        print(">>> Flattening PDF with fitz...")
-        # Flatten and add signature
-        doc = fitz.open(filled_path)
+        template_info = resolve_template(template)
+        template_path = template_info['path']
         
-        # Add signature if present
-        signature_base64 = data.get('signature_base64')
-        signature_placed = False
+        # Check if template exists
+        if not os.path.exists(template_path):
+            print(f">>> ERROR: PDF template not found at {template_path}")
+            print(">>> PDF generation skipped. Application will still be saved to Google Sheets.")
+            return None
         
-        if signature_base64:
-            print(">>> Adding signature to PDF...")
-            try:
-                sig_bytes = base64.b64decode(signature_base64)
-                sig_img = Image.open(io.BytesIO(sig_bytes))
-                sig_buffer = io.BytesIO()
-                sig_img.save(sig_buffer, format='PNG')
-                sig_buffer.seek(0)
-                
-                # Try to find signature field first
-                for page_num, page in enumerate(doc):
-                    widgets = page.widgets()
-                    if widgets:
-                        for widget in widgets:
-                            if widget.field_name and 'signature' in widget.field_name.lower():
-                                # Get widget rectangle
-                                rect = widget.rect
-                                if rect and rect.is_valid and not rect.is_empty:
-                                    page.insert_image(rect, stream=sig_buffer.getvalue(), keep_proportion=True)
-                                    signature_placed = True
-                                    widget.field_flags |= 1 << 0  # Set ReadOnly
-                                    widget.update()
-                                    break
-                    if signature_placed:
-                        break
-                
-                # If no signature field found, place on last page at default location
-                if not signature_placed:
-                    page = doc[-1]
-                    # Adjust these coordinates to match your PDF template
-                    rect = fitz.Rect(100, 650, 300, 700)
-                    
-                    if rect and rect.is_valid and not rect.is_empty:
-                        page.insert_image(rect, stream=sig_buffer.getvalue(), keep_proportion=True)
-                        signature_placed = True
-                
-                print(f">>> Signature placed: {signature_placed}")
-                
-            except Exception as e:
-                print(f">>> Could not add signature to PDF: {e}")
-                print(traceback.format_exc())
+        print(f">>> PDF template {template_info['id']} found at {template_path}")
         
-        print(">>> Making all fields read-only...")
-        # Make all fields read-only
-        for page in doc:
-            widgets = page.widgets()
-            if widgets:
-                for widget in widgets:
-                    widget.update()
-                    widget.field_flags |= 1 << 0  # Set ReadOnly
+        print(f">>> Rendering with {engine} engine...")
+        if engine == "pdfrw":
+            doc = _render_with_pdfrw(pdf_data, signature, template_path)
+        elif engine == "pymupdf":
+            doc = _render_with_pymupdf(pdf_data, signature, template_path)
+        else:
+            doc = _render_with_overlay(pdf_data, signature, template_path)
         
         print(">>> Saving final PDF to buffer...")
-        doc.save(output_buffer, deflate=True)
-        output_buffer.seek(0)
+        try:
+            output_buffer, stats = save_pdf(doc, profile)
+        finally:
+            doc.close()
+        print(f">>> Saved with '{stats['profile']}' profile: {stats['size'] / 1024:.1f} KB in {stats['seconds'] * 1000:.0f} ms")
         
         print(">>> PDF generated successfully!")
         return output_buffer
@@ -328,4 +1211,89 @@ def generate_application_pdf(data):
     except Exception as e:
         print(f">>> ERROR generating PDF: {e}")
         print(traceback.format_exc())
-        return None
\ No newline at end of file
+        return None
+
+
+def generate_application_pdf(data, engine=None, profile=None, template=None):
+    """
+    Generate a filled PDF from the application data
+
+    Args:
+        data: Dictionary containing all application data
+        engine: Fill engine name (see PDF_ENGINES); defaults to PDF_ENGINE
+        profile: Output profile (see PDF_OUTPUT_PROFILES); defaults to PDF_OUTPUT_PROFILE
+        template: Template id; defaults to the one stamped in data['pdf_template']
+
+    Returns:
+        BytesIO: The finished PDF, or None if generation failed
+    """
+    print(">>> Entering generate_application_pdf()")
+    print(f">>> Applicant: {data.get('first_name')} {data.get('last_name')}")
+    
+    try:
+        print(">>> Preparing PDF data...")
+        pdf_data = build_pdf_field_values(data)
+        signature = get_signature(data)
+    except Exception as e:
+        print(f">>> ERROR preparing PDF data: {e}")
+        print(traceback.format_exc())
+        return None
+    
+    return render_application_pdf(pdf_data, signature, engine, profile, template or data.get('pdf_template'))
+
+# ------------------------------------------------------------------ #
+# APPLICANT PACKET
+# ------------------------------------------------------------------ #
+def is_pdf_resume(resume_bytes):
+    """True if the uploaded resume is a PDF, judged by its content rather than its name"""
+    # PDF readers accept the header anywhere in the first 1024 bytes
+    return bool(resume_bytes) and b"%PDF-" in resume_bytes[:1024]
+
+
+def build_applicant_packet(pdf_bytes, resume_bytes, profile=None):
+    """
+    Append the pages of a PDF resume to the application PDF
+
+    Args:
+        pdf_bytes: The finished application PDF
+        resume_bytes: The uploaded resume
+        profile: Output profile (see PDF_OUTPUT_PROFILES); defaults to PDF_OUTPUT_PROFILE
+
+    Returns:
+        BytesIO: The combined packet, or None if the resume can't be merged
+        (not a PDF, password protected, damaged) - keep the two files then
+    """
+    if not is_pdf_resume(resume_bytes):
+        print(">>> Resume is not a PDF, keeping it as a separate file")
+        return None
+    
+    try:
+        import fitz
+        
+        with fitz.open(stream=resume_bytes, filetype="pdf") as resume:
+            if resume.needs_pass:
+                print(">>> Resume PDF is password protected, keeping it as a separate file")
+                return None
+            if resume.page_count == 0:
+                print(">>> Resume PDF has no pages, keeping it as a separate file")
+                return None
+            
+            packet = fitz.open(stream=pdf_bytes, filetype="pdf")
+            try:
+                application_pages = packet.page_count
+                resume_pages = resume.page_count
+                packet.insert_pdf(resume)
+                # Bookmarks so reviewers can jump straight to the resume
+                packet.set_toc([[1, "Application", 1], [1, "Resume", application_pages + 1]])
+                output_buffer, stats = save_pdf(packet, profile)
+            finally:
+                packet.close()
+        
+        print(f">>> Packet built: {application_pages} application + {resume_pages} resume pages, "
+              f"{stats['size'] / 1024:.1f} KB")
+        return output_buffer
+        
+    except Exception as e:
+        print(f">>> ERROR building applicant packet, keeping two files: {e}")
+        print(traceback.format_exc())
+        return None
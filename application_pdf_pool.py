@@ -0,0 +1,288 @@
+# application_pdf_pool.py
+# Process pool for PDF rendering
+#
+# PDF filling, flattening and deflate compression are CPU-bound.  Run in a
+# thread of the Streamlit server they compete with every other session for
+# the GIL, so the UI stalls during submission surges.  This module renders
+# PDFs in a bounded pool of worker processes instead.
+#
+# A render request is a small picklable dict (sanitized field values,
+# signature, engine and output profile names) and the response carries the
+# finished PDF bytes, so nothing but plain data crosses the process
+# boundary.  Workers import only application_pdf_generator (no Streamlit),
+# and each keeps its own template cache.  Shrinking PDF resumes and (in
+# packet mode) merging them into the application PDF run in the pool too.
+#
+# Set PDF_WORKERS=0 to render in-process.  If the pool cannot be started or
+# breaks (e.g. a worker is killed), rendering falls back to in-process.
+#
+# Finished PDFs go through application_pdf_cache, so identical data (e.g.
+# a regenerate_pdfs.py re-run) is served without rendering at all.
+
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+import traceback
+
+from application_pdf_cache import get_cached_pdf, pdf_cache_key, store_pdf
+from application_pdf_generator import (
+    build_applicant_packet,
+    build_pdf_field_values,
+    get_signature,
+    is_pdf_resume,
+    render_application_pdf,
+    resolve_template,
+)
+from application_resume import RESUME_OPTIMIZE, optimize_resume
+
+# Number of worker processes (0 = render in the calling thread)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+# Seconds to wait for one pooled render before reporting a failure
+PDF_POOL_TIMEOUT = float(os.getenv("PDF_POOL_TIMEOUT", "60"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def build_pdf_request(data, engine=None, profile=None, template=None):
+    """
+    Build the picklable render request for one application
+
+    Sanitizing happens here, so only the final field values and the
+    signature are sent to the worker (never resume bytes or session data).
+    The template defaults to the one stamped in data['pdf_template'].
+    """
+    return {
+        'fields': build_pdf_field_values(data),
+        'signature': get_signature(data),
+        'engine': engine,
+        'profile': profile,
+        'template': resolve_template(template or data.get('pdf_template'))['id'],
+    }
+
+
+def render_pdf_request(request):
+    """
+    Render one request; runs inside a worker process (or in-process)
+
+    Returns:
+        dict: {'pdf_bytes': bytes or None, 'elapsed': seconds, 'cpu': CPU seconds,
+               'pid': worker pid}
+    """
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    pdf_buffer = render_application_pdf(
+        request['fields'], request['signature'], request.get('engine'), request.get('profile'),
+        request.get('template'),
+    )
+    return {
+        'pdf_bytes': pdf_buffer.getvalue() if pdf_buffer else None,
+        'elapsed': time.perf_counter() - start,
+        'cpu': time.thread_time() - cpu_start,
+        'pid': os.getpid(),
+    }
+
+
+def get_pdf_pool():
+    """Return the shared process pool, starting it on first use (None if disabled)"""
+    global _pool
+
+    if PDF_WORKERS <= 0:
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            try:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # "spawn" so workers never inherit the server's threads/sockets
+                _pool = ProcessPoolExecutor(
+                    max_workers=PDF_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                print(f">>> PDF process pool started with {PDF_WORKERS} workers")
+            except Exception as e:
+                print(f">>> WARNING: Could not start PDF process pool, rendering in-process: {e}")
+                return None
+        return _pool
+
+
+def _discard_pool(pool, kill=False):
+    """
+    Drop a broken pool so the next call starts a fresh one
+
+    Args:
+        kill: Also terminate its worker processes (one is stuck in a render);
+            renders still running in them fail over to in-process
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    # Only the executor knows its processes; the attribute is gone after shutdown
+    processes = list((getattr(pool, '_processes', None) or {}).values()) if kill else []
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        with contextlib.suppress(Exception):
+            process.terminate()
+
+
+def shutdown_pdf_pool():
+    """Stop the worker processes (used by CLI tools before exiting)"""
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+@contextlib.contextmanager
+def silenced_stdout():
+    """
+    Point file descriptor 1 at devnull, so the generator's logging is
+    dropped in this process and in pool workers started meanwhile (CLI tools)
+    """
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, 'w') as devnull:
+        os.dup2(devnull.fileno(), 1)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+
+
+def _fall_back_in_process(pool, error):
+    """Log why the pool can't be used and drop it; the caller then runs in-process"""
+    print(f">>> WARNING: PDF process pool unavailable, running in-process: {error}")
+    print(traceback.format_exc())
+    _discard_pool(pool)
+
+
+def _run_pooled(func, *args):
+    """
+    Run func(*args) in the pool, or in-process if the pool is disabled or broken
+
+    Exceptions raised by func propagate unchanged.  Raises
+    concurrent.futures.TimeoutError after PDF_POOL_TIMEOUT seconds.
+    A call still queued then is cancelled; one already running holds its
+    worker, so the pool is replaced and its workers terminated.
+    """
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+    from concurrent.futures.process import BrokenProcessPool
+
+    pool = get_pdf_pool()
+    if pool is not None:
+        try:
+            future = pool.submit(func, *args)
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            # Pool shut down, or its workers could not be started
+            _fall_back_in_process(pool, e)
+        else:
+            try:
+                return future.result(timeout=PDF_POOL_TIMEOUT)
+            except BrokenProcessPool as e:
+                # A worker died; exceptions raised by func itself propagate as is
+                _fall_back_in_process(pool, e)
+            except FutureTimeoutError:
+                if future.done():
+                    raise  # Raised by func itself, not the wait
+                if not future.cancel():
+                    print(f">>> WARNING: PDF worker stuck for {PDF_POOL_TIMEOUT:.0f}s, restarting the process pool")
+                    _discard_pool(pool, kill=True)
+                raise
+
+    return func(*args)
+
+
+def render_pdf(data, engine=None, profile=None, template=None):
+    """
+    Generate the application PDF in the process pool
+
+    Drop-in replacement for generate_application_pdf(data) from a
+    background thread.  Identical input is served from the PDF cache.
+
+    Returns:
+        BytesIO: The finished PDF, or None if generation failed
+    """
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+
+    request = build_pdf_request(data, engine, profile, template)
+    cache_key = pdf_cache_key(request)
+    cached = get_cached_pdf(cache_key)
+    if cached:
+        print(f">>> PDF served from cache ({cache_key[:12]})")
+        return io.BytesIO(cached)
+
+    try:
+        response = _run_pooled(render_pdf_request, request)
+    except FutureTimeoutError:
+        print(f">>> ERROR: PDF render timed out after {PDF_POOL_TIMEOUT:.0f}s")
+        return None
+    print(f">>> PDF rendered by process {response['pid']} in {response['elapsed']:.2f}s")
+
+    if not response['pdf_bytes']:
+        return None
+    store_pdf(cache_key, response['pdf_bytes'])
+    return io.BytesIO(response['pdf_bytes'])
+
+
+def merge_packet_request(request):
+    """Build an applicant packet; runs inside a worker process (or in-process)"""
+    packet = build_applicant_packet(request['pdf_bytes'], request['resume_bytes'], request.get('profile'))
+    return packet.getvalue() if packet else None
+
+
+def render_packet(pdf_buffer, resume_bytes, profile=None):
+    """
+    Append a PDF resume to the application PDF in the process pool
+
+    Returns:
+        BytesIO: The combined packet, or None if the resume can't be merged
+        (upload/email the two files separately then)
+    """
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+
+    request = {
+        'pdf_bytes': pdf_buffer.getvalue(),
+        'resume_bytes': resume_bytes,
+        'profile': profile,
+    }
+    try:
+        packet_bytes = _run_pooled(merge_packet_request, request)
+    except FutureTimeoutError:
+        print(f">>> ERROR: Packet merge timed out after {PDF_POOL_TIMEOUT:.0f}s")
+        return None
+
+    return io.BytesIO(packet_bytes) if packet_bytes else None
+
+
+def prepare_resume(resume_bytes):
+    """
+    Shrink a PDF resume in the process pool (see application_resume)
+
+    Returns:
+        tuple: (resume bytes to use, report dict with original_size,
+                final_size, method and seconds)
+    """
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+
+    if not RESUME_OPTIMIZE or not is_pdf_resume(resume_bytes):
+        # Left as is: answer here rather than send the file to a worker and back
+        return optimize_resume(resume_bytes)
+
+    try:
+        return _run_pooled(optimize_resume, resume_bytes)
+    except FutureTimeoutError:
+        print(f">>> ERROR: Resume optimization timed out after {PDF_POOL_TIMEOUT:.0f}s, using the original")
+        size = len(resume_bytes)
+        return resume_bytes, {'original_size': size, 'final_size': size, 'method': 'timeout', 'seconds': PDF_POOL_TIMEOUT}
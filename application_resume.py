@@ -0,0 +1,95 @@
+# application_resume.py
+# Resume preprocessing: shrink uploaded PDF resumes before they are stored
+#
+# Scanned resumes are often 10-20 MB of barely compressed page images, and
+# the raw bytes were forwarded to Drive (and held in memory) as uploaded.
+# PDF resumes are rewritten with PyMuPDF instead:
+#   - at or under the size target: unused objects are dropped and streams
+#     deflated (lossless; the file is also repaired/normalized on the way)
+#   - over the target: page images above the pass's resolution are
+#     downsampled and recompressed, trying RESUME_IMAGE_PASSES in order
+#     until the file fits (the last pass is used if none does)
+# The result is only used when it is smaller than the upload.  Word/text
+# resumes and password-protected PDFs are passed through unchanged.
+
+import os
+import time
+import traceback
+
+from application_pdf_generator import is_pdf_resume
+
+# Set to "false" to upload resumes exactly as received
+RESUME_OPTIMIZE = os.getenv("RESUME_OPTIMIZE", "true").lower() == "true"
+
+# Size to aim for, in MB
+RESUME_TARGET_MB = float(os.getenv("RESUME_TARGET_MB", "2"))
+
+# (target DPI, JPEG quality) per pass; images are only resampled when they
+# are at least a quarter above the target resolution
+RESUME_IMAGE_PASSES = ((150, 75), (110, 60), (72, 50))
+
+
+def _save_compact(doc):
+    """Serialize without unused/duplicate objects, with deflated streams"""
+    return doc.tobytes(garbage=4, deflate=True, deflate_images=True, deflate_fonts=True, use_objstms=True)
+
+
+def optimize_resume(resume_bytes, target_mb=None):
+    """
+    Shrink a PDF resume toward the size target
+
+    Args:
+        resume_bytes: The uploaded resume
+        target_mb: Size target in MB; defaults to RESUME_TARGET_MB
+
+    Returns:
+        tuple: (resume bytes to use, report dict with original_size,
+                final_size, method and seconds)
+    """
+    start = time.perf_counter()
+    target = (RESUME_TARGET_MB if target_mb is None else target_mb) * 1024 * 1024
+    report = {
+        'original_size': len(resume_bytes),
+        'final_size': len(resume_bytes),
+        'method': 'unchanged',
+        'seconds': 0.0,
+    }
+
+    def finish(data, method):
+        report['final_size'] = len(data)
+        report['method'] = method
+        report['seconds'] = time.perf_counter() - start
+        return data, report
+
+    if not RESUME_OPTIMIZE:
+        return finish(resume_bytes, 'disabled')
+    if not is_pdf_resume(resume_bytes):
+        return finish(resume_bytes, 'not a PDF')
+
+    try:
+        import fitz
+
+        with fitz.open(stream=resume_bytes, filetype="pdf") as doc:
+            if doc.needs_pass:
+                return finish(resume_bytes, 'password protected')
+            if len(resume_bytes) <= target:
+                candidate, method = _save_compact(doc), 'lossless'
+
+        if len(resume_bytes) > target:
+            for dpi, quality in RESUME_IMAGE_PASSES:
+                # Every pass starts from the upload, so quality loss doesn't compound
+                with fitz.open(stream=resume_bytes, filetype="pdf") as doc:
+                    doc.rewrite_images(dpi_threshold=dpi + dpi // 4, dpi_target=dpi, quality=quality)
+                    candidate, method = _save_compact(doc), f"images {dpi} dpi q{quality}"
+                print(f">>> Resume pass {method}: {len(candidate) / 1024:.0f} KB")
+                if len(candidate) <= target:
+                    break
+
+        if len(candidate) >= len(resume_bytes):
+            return finish(resume_bytes, 'unchanged')
+        return finish(candidate, method)
+
+    except Exception as e:
+        print(f">>> ERROR optimizing resume, using the original: {e}")
+        print(traceback.format_exc())
+        return finish(resume_bytes, 'error')
@@ -102,6 +102,9 @@ def render_scheduling_section():
                 use_container_width=True
             ):
                 st.session_state.selected_time = time_slot
+                # Read by the application form for the submission's location and date
+                st.session_state.selected_location = selected_date['location']
+                st.session_state.selected_date_value = selected_date['value']
                 st.session_state.selected_schedule = {
                     'location': selected_date['location'],
                     'address': selected_date['address'],
@@ -0,0 +1,233 @@
+# application_sheet_columns.py
+# Column layout of the applications worksheet
+#
+# An application is turned into a {column header: value} record and placed
+# by the header row the worksheet actually has (application_sheets_manager
+# reads row 1), so inserting or moving a column in the sheet no longer
+# shifts every value after it.  SHEET_COLUMNS is the standard header row
+# (see README.txt), used for sheets and exports without one.
+#
+# No Streamlit imports: regenerate_pdfs.py reads sheet exports with this.
+
+SHEET_COLUMNS = [
+    # Basic info
+    "First Name", "Last Name", "Email", "Phone", "Alternate Phone",
+    "Date of Birth", "Street Address", "City", "State", "Zip",
+    # Interview schedule
+    "Interview Location", "Interview Date", "Interview Time",
+    # Position and availability info
+    "Positions Applied For", "Hours Preferred", "Expected Payrate",
+    "Availability Restrictions", "Available to Start", "Why Applying", "Special Training/Skills",
+    # Legal info
+    "Legally Entitled to Work", "Can Perform Physical Duties", "Drug Test Willing",
+    "Background Check Willing", "Valid Drivers License", "Reliable Transportation",
+    "Submission Timestamp",
+    # Employers (3 x 7)
+    *[
+        f"Employer {n} {field}"
+        for n in (1, 2, 3)
+        for field in ("Name", "Location", "Hire Date", "End Date", "Position", "Pay Rate", "Reason for Leaving")
+    ],
+    # Education
+    "College Name & City", "College Area of Study", "College Graduated", "College Completion Date",
+    "High School Name & City", "High School Area of Study", "High School Graduated", "High School Completion Date",
+    # References (3 x 3)
+    *[f"Reference {n} {field}" for n in (1, 2, 3) for field in ("Name", "Contact", "Relationship")],
+    "PDF Link",
+    "PDF Template",
+]
+
+# Column header -> application data key, for the single-value columns
+_COLUMN_KEYS = {
+    "First Name": 'first_name',
+    "Last Name": 'last_name',
+    "Email": 'email',
+    "Phone": 'phone',
+    "Alternate Phone": 'alternate_phone',
+    "Date of Birth": 'dob',
+    "Street Address": 'street_address',
+    "City": 'city',
+    "State": 'state',
+    "Zip": 'zip',
+    "Interview Location": 'location',
+    "Interview Date": 'date',
+    "Interview Time": 'time_slot',
+    "Expected Payrate": 'expected_payrate',
+    "Availability Restrictions": 'availability_restrictions',
+    "Available to Start": 'start_date',
+    "Why Applying": 'why_applying',
+    "Special Training/Skills": 'special_training',
+    "Legally Entitled to Work": 'legally_entitled',
+    "Can Perform Physical Duties": 'perform_duties',
+    "Drug Test Willing": 'drug_test',
+    "Background Check Willing": 'background_check',
+    "Valid Drivers License": 'drivers_license',
+    "Reliable Transportation": 'reliable_transport',
+    "Submission Timestamp": 'submission_timestamp',
+    "College Name & City": 'college_name',
+    "College Area of Study": 'college_study',
+    "College Graduated": 'college_graduated',
+    "College Completion Date": 'college_completion',
+    "High School Name & City": 'hs_name',
+    "High School Area of Study": 'hs_study',
+    "High School Graduated": 'hs_graduated',
+    "High School Completion Date": 'hs_completion',
+    "PDF Link": 'pdf_link',
+    "PDF Template": 'pdf_template',
+}
+
+_EMPLOYER_FIELDS = {
+    "Name": 'employer',
+    "Location": 'location',
+    "Hire Date": 'hire_date',
+    "End Date": 'end_date',
+    "Position": 'position',
+    "Pay Rate": 'pay_rate',
+    "Reason for Leaving": 'reason',
+}
+
+_REFERENCE_FIELDS = {
+    "Name": 'name',
+    "Contact": 'contact',
+    "Relationship": 'relationship',
+}
+
+# positions key -> label in the "Positions Applied For" column
+POSITION_LABELS = {
+    'wpc_cashier': "WPC-Cashier",
+    'wpc_greenhouse': "WPC-Greenhouse",
+    'wpc_nursery': "WPC-Nursery",
+    'wpc_waterer': "WPC-Waterer/Production",
+    'wpc_admin': "WPC-Administration",
+    'land_designer': "Landscaping-Designer",
+    'land_foreman': "Landscaping-Foreman",
+    'land_installer': "Landscaping-Installer",
+    'cafe_foh': "Cafe-FOH",
+    'cafe_boh': "Cafe-BOH",
+    'cafe_admin': "Cafe-Admin",
+}
+
+# hours key -> label in the "Hours Preferred" column
+HOUR_LABELS = {
+    'hours_15_25': "15-25",
+    'hours_30_40': "30-40",
+    'hours_40_plus': "40+",
+}
+
+
+def normalize_header(name):
+    """Header comparison ignores case and extra whitespace"""
+    return " ".join(str(name).split()).lower()
+
+
+def format_positions_for_sheet(positions):
+    """Format positions dictionary for sheet"""
+    position_list = [label for key, label in POSITION_LABELS.items() if positions.get(key)]
+    if positions.get('other'):
+        other_desc = positions.get('other_description', 'Not specified')
+        position_list.append(f"Other: {other_desc}")
+    return ", ".join(position_list)
+
+
+def format_hours_for_sheet(data):
+    """Format hours preference for sheet"""
+    return ", ".join(label for key, label in HOUR_LABELS.items() if data.get(key))
+
+
+def build_sheet_record(data):
+    """
+    Map application data to worksheet values by column header
+
+    Returns:
+        dict: Header -> cell value for every column in SHEET_COLUMNS
+    """
+    record = {header: data.get(key, '') for header, key in _COLUMN_KEYS.items()}
+    record["Positions Applied For"] = format_positions_for_sheet(data.get('positions', {}))
+    record["Hours Preferred"] = format_hours_for_sheet(data)
+
+    employers = data.get('employers', [])
+    for i in range(3):
+        emp = employers[i] if i < len(employers) else {}
+        for field, key in _EMPLOYER_FIELDS.items():
+            record[f"Employer {i + 1} {field}"] = emp.get(key, '')
+
+    references = data.get('references', [])
+    for i in range(3):
+        ref = references[i] if i < len(references) else {}
+        for field, key in _REFERENCE_FIELDS.items():
+            record[f"Reference {i + 1} {field}"] = ref.get(key, '')
+
+    return record
+
+
+def record_to_row(record, headers=None):
+    """
+    Order a record's values by a header row
+
+    Args:
+        record: Header -> value map from build_sheet_record()
+        headers: The worksheet's header row; defaults to SHEET_COLUMNS
+
+    Returns:
+        list: Cell values, '' under headers the record doesn't know
+    """
+    values = {normalize_header(header): value for header, value in record.items()}
+    return [values.get(normalize_header(header), '') for header in headers or SHEET_COLUMNS]
+
+
+def row_to_record(row, headers=None):
+    """Pair a row's cells with a header row (SHEET_COLUMNS by default), keyed by the standard header names"""
+    standard = {normalize_header(header): header for header in SHEET_COLUMNS}
+    record = {}
+    for header, value in zip(headers or SHEET_COLUMNS, row):
+        record[standard.get(normalize_header(header), header)] = value
+    return record
+
+
+def parse_positions(text):
+    """Turn the "Positions Applied For" cell back into the positions dict"""
+    positions = {}
+    if not text:
+        return positions
+
+    # "Other: ..." is always last and its description may contain commas
+    text, separator, other = text.partition("Other: ")
+    if separator:
+        positions['other'] = True
+        positions['other_description'] = other.strip()
+
+    keys = {label: key for key, label in POSITION_LABELS.items()}
+    for label in text.split(","):
+        key = keys.get(label.strip())
+        if key:
+            positions[key] = True
+    return positions
+
+
+def sheet_record_to_application(record):
+    """
+    Rebuild application data from a worksheet record (inverse of build_sheet_record)
+
+    Returns:
+        dict: Application data accepted by generate_application_pdf()
+    """
+    data = {key: record.get(header, '') for header, key in _COLUMN_KEYS.items()}
+    data['positions'] = parse_positions(record.get("Positions Applied For", ''))
+
+    hours = {label.strip() for label in record.get("Hours Preferred", '').split(",")}
+    for key, label in HOUR_LABELS.items():
+        data[key] = label in hours
+
+    data['employers'] = []
+    for n in (1, 2, 3):
+        employer = {key: record.get(f"Employer {n} {field}", '') for field, key in _EMPLOYER_FIELDS.items()}
+        if any(str(value).strip() for value in employer.values()):
+            data['employers'].append(employer)
+
+    data['references'] = []
+    for n in (1, 2, 3):
+        reference = {key: record.get(f"Reference {n} {field}", '') for field, key in _REFERENCE_FIELDS.items()}
+        if any(str(value).strip() for value in reference.values()):
+            data['references'].append(reference)
+
+    return data
@@ -1,7 +1,23 @@
 # application_sheets_manager.py
 # Google Sheets integration for job fair applications
 
+import contextlib
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
 import streamlit as st
+from application_api_limiter import call_google_api, error_status, is_transport_error
+from application_sheet_columns import SHEET_COLUMNS, build_sheet_record, normalize_header, record_to_row, row_to_record
 from config_secrets import get_gcp_service_account, get_sheet_config
 
 # Get config from centralized secrets
@@ -16,6 +32,72 @@ SCOPES = [
     "https://www.googleapis.com/auth/drive"
 ]
 
+# Rows are written by one background writer that sends whatever arrives
+# together in a single append_rows call: a batch goes out once it has
+# SHEET_BATCH_ROWS rows or SHEET_BATCH_MS after its first row came in
+SHEET_BATCH_ROWS = int(os.getenv("SHEET_BATCH_ROWS", "20"))
+SHEET_BATCH_MS = float(os.getenv("SHEET_BATCH_MS", "250"))
+
+# Seconds a submission waits for its row to be written before reporting failure
+SHEET_WRITE_TIMEOUT = float(os.getenv("SHEET_WRITE_TIMEOUT", "60"))
+
+# How rows are added:
+#   "append" - append_rows; Sheets finds the end of the table on every call,
+#              which gets slower as the worksheet grows
+#   "cursor" - write to an explicit A1 range at a next-row cursor kept in
+#              this process (synced from the sheet when the handle is opened
+#              and whenever the target rows turn out to be taken), so write
+#              time stays flat.  Only for a single app process: other
+#              writers are detected by the free-rows check, not prevented.
+SHEET_WRITE_MODE = os.getenv("SHEET_WRITE_MODE", "append").lower()
+
+# Rows added to the worksheet's grid at a time when the cursor reaches its end
+SHEET_GROW_ROWS = int(os.getenv("SHEET_GROW_ROWS", "500"))
+
+# Worksheet sharding, so no single worksheet grows to thousands of rows:
+#   "none"       - every row goes to WORKSHEET_NAME
+#   "month"      - "<WORKSHEET_NAME> 2026-03", by submission month
+#   "event_date" - "<WORKSHEET_NAME> 2026-02-18", by interview date
+#   "rows"       - WORKSHEET_NAME until it holds SHEET_SHARD_ROWS applicants,
+#                  then "<WORKSHEET_NAME> (2)", "(3)", ...
+# Shards are created with WORKSHEET_NAME's header row; read_sheet_records()
+# reads across all of them.
+SHEET_SHARDING = os.getenv("SHEET_SHARDING", "none").lower()
+SHEET_SHARD_ROWS = int(os.getenv("SHEET_SHARD_ROWS", "5000"))
+
+# Seconds the worksheet handle and header row are reused before reopening;
+# after inserting or moving columns, rows follow the new layout within this
+SHEET_HANDLE_TTL = float(os.getenv("SHEET_HANDLE_TTL", "300"))
+
+# Uploads up to this size go in one multipart request; larger ones use a
+# resumable session sent in DRIVE_CHUNK_MB chunks (a multiple of 256 KB)
+DRIVE_MULTIPART_MAX_MB = float(os.getenv("DRIVE_MULTIPART_MAX_MB", "5"))
+DRIVE_CHUNK_MB = float(os.getenv("DRIVE_CHUNK_MB", "8"))
+
+# Times a resumable upload carries on after a dropped connection
+DRIVE_UPLOAD_RESUMES = int(os.getenv("DRIVE_UPLOAD_RESUMES", "3"))
+
+# Resumes already in Drive, by content hash (see RESUME DEDUPLICATION): set
+# a file path to keep the index across restarts, and how many hours an
+# entry is trusted before the Drive file is checked again
+RESUME_INDEX_PATH = os.getenv("RESUME_INDEX_PATH", "")
+RESUME_VERIFY_HOURS = float(os.getenv("RESUME_VERIFY_HOURS", "24"))
+
+# Subfolders of the PDF folder that uploads go to (see DRIVE FOLDERS):
+#   "none"       - everything in PDF_FOLDER_ID
+#   "month"      - "2026-03", by submission month
+#   "event_date" - the interview date, e.g. "2026-02-18"
+DRIVE_FOLDER_SHARDING = os.getenv("DRIVE_FOLDER_SHARDING", "none").lower()
+
+# Drive clients kept for concurrent uploads (see DRIVE CLIENT POOL)
+DRIVE_POOL_SIZE = int(os.getenv("DRIVE_POOL_SIZE", "4"))
+
+# Seconds to wait for a free Drive client when all are checked out
+DRIVE_POOL_WAIT = float(os.getenv("DRIVE_POOL_WAIT", "30"))
+
+# Socket timeout of a Drive client's connection, in seconds
+DRIVE_HTTP_TIMEOUT = float(os.getenv("DRIVE_HTTP_TIMEOUT", "60"))
+
 
 @st.cache_resource
 def get_gspread_client():
@@ -32,10 +114,27 @@ def get_gspread_client():
     return gspread.authorize(creds)
 
 
-@st.cache_resource
-def get_drive_service():
-    """Create and return Google Drive service. Cached for performance."""
+# ------------------------------------------------------------------ #
+# DRIVE CLIENT POOL
+# ------------------------------------------------------------------ #
+# A Drive service object sits on an httplib2.Http, which is not thread-safe:
+# one shared service made concurrent submissions fail with transport errors.
+# Each thread instead checks a service out of this pool for the length of a
+# call and returns it afterwards.  Every service has its own Http, whose
+# keep-alive connection to Google is reused by the next call; the most
+# recently returned one is handed out first, so its connection is warm.
+# Gspread is not pooled: all Sheets traffic goes through the single
+# batched writer thread below.
+_drive_pool = queue.LifoQueue()
+_drive_pool_stats = {'created': 0, 'discarded': 0, 'checkouts': 0, 'waits': 0}
+_drive_pool_lock = threading.Lock()
+
+
+def _build_drive_service():
+    """Create an authorized Google Drive service with its own HTTP connection"""
     # Lazy import - only load when needed
+    import google_auth_httplib2
+    import httplib2
     from google.oauth2.service_account import Credentials
     from googleapiclient.discovery import build
     
@@ -44,186 +143,982 @@ def get_drive_service():
         raise KeyError("Service account JSON not found in secrets")
     
     creds = Credentials.from_service_account_info(sa_info, scopes=SCOPES)
-    service = build("drive", "v3", credentials=creds)
-    return service
+    http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=DRIVE_HTTP_TIMEOUT))
+    return build("drive", "v3", http=http, cache_discovery=False)
+
+
+@contextlib.contextmanager
+def drive_service():
+    """
+    Check out a Drive service for this thread's exclusive use
+
+    A client whose call failed below HTTP (a dropped or broken connection)
+    is thrown away rather than returned to the pool.
+
+    Raises:
+        RuntimeError: All DRIVE_POOL_SIZE clients stayed busy for DRIVE_POOL_WAIT seconds
+    """
+    service = None
+    waited = False
+    deadline = time.monotonic() + DRIVE_POOL_WAIT
+    while service is None:
+        try:
+            service = _drive_pool.get_nowait()
+            break
+        except queue.Empty:
+            pass
+
+        with _drive_pool_lock:
+            build_new = _drive_pool_stats['created'] < DRIVE_POOL_SIZE
+            if build_new:
+                _drive_pool_stats['created'] += 1
+        if build_new:
+            try:
+                service = _build_drive_service()
+            except Exception:
+                with _drive_pool_lock:
+                    _drive_pool_stats['created'] -= 1
+                raise
+            break
+
+        # All clients are out; a discarded one frees a slot, so look again every second
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError(f"No Drive client free after {DRIVE_POOL_WAIT:g}s")
+        if not waited:
+            waited = True
+            with _drive_pool_lock:
+                _drive_pool_stats['waits'] += 1
+        try:
+            service = _drive_pool.get(timeout=min(1.0, remaining))
+        except queue.Empty:
+            pass
+
+    with _drive_pool_lock:
+        _drive_pool_stats['checkouts'] += 1
+    try:
+        yield service
+    except Exception as e:
+        if is_transport_error(e):
+            # Transport error: the connection may be half-used, build a new client next time
+            with _drive_pool_lock:
+                _drive_pool_stats['created'] -= 1
+                _drive_pool_stats['discarded'] += 1
+            service = None
+        raise
+    finally:
+        if service is not None:
+            _drive_pool.put(service)
+
+
+def get_drive_pool_stats():
+    """
+    Counters of the Drive client pool
+
+    Returns:
+        dict: created (live clients), discarded, checkouts, waits, idle
+    """
+    with _drive_pool_lock:
+        stats = dict(_drive_pool_stats)
+    stats['idle'] = _drive_pool.qsize()
+    return stats
+
+
+# ------------------------------------------------------------------ #
+# DRIVE FOLDERS
+# ------------------------------------------------------------------ #
+# Listing one folder with every PDF and resume ever uploaded got slow, so
+# uploads can go to subfolders of PDF_FOLDER_ID per month or event date
+# (DRIVE_FOLDER_SHARDING).  Subfolders are found or created on first use
+# and their ids kept for the life of the process.
+DRIVE_FOLDER_MIMETYPE = "application/vnd.google-apps.folder"
+
+_drive_folder_cache = {}    # subfolder name -> folder id
+_drive_folder_lock = threading.Lock()
+
+
+def drive_query_value(value):
+    """Quote a value for a Drive files.list query"""
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def drive_folder_name(data):
+    """
+    Subfolder an application's files belong in under DRIVE_FOLDER_SHARDING
+
+    Returns:
+        str: Subfolder name, or None for PDF_FOLDER_ID itself
+    """
+    if DRIVE_FOLDER_SHARDING == "month":
+        # The submission's month, so regenerated PDFs land next to the originals
+        timestamp = str(data.get('submission_timestamp') or '')
+        return timestamp[:7] if re.match(r"\d{4}-\d{2}", timestamp) else time.strftime('%Y-%m')
+    if DRIVE_FOLDER_SHARDING == "event_date":
+        return event_date_name(data.get('date')) or None
+    return None
+
+
+def list_drive_files(query, fields="id,name"):
+    """
+    All files matching a Drive query, following the result pages
+
+    Returns:
+        list: File resources with the given fields
+    """
+    files = []
+    page_token = None
+    while True:
+        with drive_service() as service:
+            result = call_google_api('drive', service.files().list(
+                q=query,
+                fields=f"nextPageToken,files({fields})",
+                pageSize=1000,
+                pageToken=page_token,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
+            ).execute)
+        files.extend(result.get('files', []))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            return files
+
+
+def list_drive_folders():
+    """
+    Subfolders of PDF_FOLDER_ID
+
+    Returns:
+        dict: Folder name -> folder id
+    """
+    query = (f"{drive_query_value(PDF_FOLDER_ID)} in parents and mimeType = "
+             f"{drive_query_value(DRIVE_FOLDER_MIMETYPE)} and trashed = false")
+    return {folder['name']: folder['id'] for folder in list_drive_files(query, fields="id,name")}
+
+
+def get_drive_folder(name=None):
+    """
+    Id of the PDF folder's subfolder name, created if it doesn't exist
+
+    Args:
+        name: Subfolder name; None returns PDF_FOLDER_ID
+    """
+    if not name:
+        return PDF_FOLDER_ID
+
+    # Looked up and created under the lock, so concurrent uploads to a new
+    # subfolder don't each create one
+    with _drive_folder_lock:
+        folder_id = _drive_folder_cache.get(name)
+        if folder_id:
+            return folder_id
+
+        query = (f"{drive_query_value(PDF_FOLDER_ID)} in parents and name = {drive_query_value(name)} "
+                 f"and mimeType = {drive_query_value(DRIVE_FOLDER_MIMETYPE)} and trashed = false")
+        found = list_drive_files(query, fields="id")
+        if found:
+            folder_id = found[0]['id']
+        else:
+            print(f">>> Creating Drive folder {name}")
+            with drive_service() as service:
+                folder_id = call_google_api('drive', service.files().create(
+                    body={"name": name, "mimeType": DRIVE_FOLDER_MIMETYPE, "parents": [PDF_FOLDER_ID]},
+                    fields="id",
+                    supportsAllDrives=True,
+                ).execute, idempotent=False)['id']
+
+        _drive_folder_cache[name] = folder_id
+        return folder_id
+
+
+def forget_drive_folder(name):
+    """Drop a cached subfolder id (the folder was deleted or moved)"""
+    with _drive_folder_lock:
+        _drive_folder_cache.pop(name, None)
 
 
-def upload_pdf_to_drive(pdf_buffer, filename, mimetype="application/pdf"):
+# ------------------------------------------------------------------ #
+# DRIVE UPLOADS
+# ------------------------------------------------------------------ #
+# A resumable upload costs an extra round trip to open its session, which
+# is most of the time for a 200 KB application PDF; those go as a single
+# multipart request.  Large files (scanned resumes) are copied to a spooled
+# temp file and sent in chunks over a resumable session, so a failure
+# part-way continues from the last chunk Google confirmed instead of
+# starting over.
+_drive_upload_stats = {
+    'uploads': 0,
+    'multipart': 0,
+    'resumable': 0,
+    'chunks': 0,
+    'resumes': 0,
+    'bytes': 0,
+    'seconds': 0.0,
+}
+_drive_upload_lock = threading.Lock()
+
+
+def _chunk_bytes():
+    """DRIVE_CHUNK_MB rounded to the 256 KB multiple Drive requires"""
+    unit = 256 * 1024
+    return max(unit, int(DRIVE_CHUNK_MB * 1024 * 1024) // unit * unit)
+
+
+def _upload_resumable(request, filename):
+    """
+    Send a resumable upload chunk by chunk
+
+    Quota and server errors are retried by the limiter, dropped connections
+    here; either way the upload continues from the last chunk Drive confirmed.
+
+    Returns:
+        tuple: (file resource, number of chunks sent)
+    """
+    response = None
+    chunks = 0
+    resumes = 0
+    while response is None:
+        try:
+            _, response = call_google_api('drive', request.next_chunk)
+            chunks += 1
+        except Exception as e:
+            if not is_transport_error(e) or resumes >= DRIVE_UPLOAD_RESUMES:
+                raise
+            resumes += 1
+            print(f">>> Drive upload of {filename} interrupted ({e}), resuming ({resumes}/{DRIVE_UPLOAD_RESUMES})")
+            with _drive_upload_lock:
+                _drive_upload_stats['resumes'] += 1
+            time.sleep(resumes)
+    return response, chunks
+
+
+def _upload_file(file_buffer, filename, mimetype, folder=None):
+    """
+    Upload a file to the Drive PDF folder, multipart or resumable by size
+
+    Args:
+        folder: Subfolder name from drive_folder_name(); None for the PDF folder itself
+
+    Returns:
+        str: Drive file id (raises on failure)
+    """
+    # Lazy import
+    from googleapiclient.http import MediaIoBaseUpload
+
+    start = time.perf_counter()
+    file_buffer.seek(0, os.SEEK_END)
+    size = file_buffer.tell()
+    file_buffer.seek(0)
+    multipart = size <= DRIVE_MULTIPART_MAX_MB * 1024 * 1024
+
+    spool = None
+    try:
+        if multipart:
+            media = MediaIoBaseUpload(file_buffer, mimetype=mimetype, resumable=False)
+        else:
+            chunk_size = _chunk_bytes()
+            spool = tempfile.SpooledTemporaryFile(max_size=chunk_size)
+            shutil.copyfileobj(file_buffer, spool)
+            spool.seek(0)
+            media = MediaIoBaseUpload(spool, mimetype=mimetype, chunksize=chunk_size, resumable=True)
+
+        for attempt in (1, 2):
+            file_metadata = {
+                "name": filename,
+                "parents": [get_drive_folder(folder)]
+            }
+            try:
+                with drive_service() as service:
+                    request = service.files().create(
+                        body=file_metadata,
+                        media_body=media,
+                        fields="id",
+                        supportsAllDrives=True  # Important for Shared Drives
+                    )
+                    if multipart:
+                        # Rate limited and retried; Google's advice for a failed multipart upload is to resend it
+                        uploaded_file, chunks = call_google_api('drive', request.execute), 1
+                    else:
+                        uploaded_file, chunks = _upload_resumable(request, filename)
+                break
+            except Exception as e:
+                if not folder or attempt == 2 or error_status(e) != 404:
+                    raise
+                # The cached subfolder was deleted; find or create it again
+                print(f">>> Drive folder {folder} not found, looking it up again")
+                forget_drive_folder(folder)
+    finally:
+        if spool is not None:
+            spool.close()
+
+    seconds = time.perf_counter() - start
+    print(f">>> Drive upload of {filename}: {size / 1024:.0f} KB in {seconds:.2f}s "
+          f"({size / seconds / (1024 * 1024) if seconds else 0:.2f} MB/s, "
+          f"{'multipart' if multipart else f'resumable, {chunks} chunks'})")
+    with _drive_upload_lock:
+        _drive_upload_stats['uploads'] += 1
+        _drive_upload_stats['multipart' if multipart else 'resumable'] += 1
+        _drive_upload_stats['chunks'] += chunks
+        _drive_upload_stats['bytes'] += size
+        _drive_upload_stats['seconds'] += seconds
+
+    return uploaded_file.get("id")
+
+
+def drive_file_link(file_id):
+    """Sharing link of a Drive file"""
+    return f"https://drive.google.com/file/d/{file_id}/view?usp=sharing"
+
+
+def upload_pdf_to_drive(pdf_buffer, filename, mimetype="application/pdf", folder=None):
     """
     Upload PDF to Google Drive shared folder
     
     Args:
         pdf_buffer: BytesIO buffer containing the PDF
         filename: Name for the PDF file
+        folder: Subfolder from drive_folder_name(), created if needed
     
     Returns:
         str: URL to the uploaded file, or empty string if failed
     """
     try:
-        # Lazy import
-        from googleapiclient.http import MediaIoBaseUpload
-        
-        service = get_drive_service()
-        
-        file_metadata = {
-            "name": filename,
-            "parents": [PDF_FOLDER_ID]
-        }
-        
-        pdf_buffer.seek(0)
-        media = MediaIoBaseUpload(pdf_buffer, mimetype=mimetype, resumable=True)
-        
-        uploaded_file = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields="id",
-            supportsAllDrives=True  # Important for Shared Drives
-        ).execute()
-        
-        file_id = uploaded_file.get("id")
-        return f"https://drive.google.com/file/d/{file_id}/view?usp=sharing"
+        return drive_file_link(_upload_file(pdf_buffer, filename, mimetype, folder))
         
     except Exception as e:
         st.error(f"Failed to upload PDF to Google Drive: {e}")
         return ""
 
 
-def format_positions_for_sheet(positions):
-    """Format positions dictionary for sheet"""
-    position_list = []
-    
-    if positions.get('wpc_cashier'): position_list.append("WPC-Cashier")
-    if positions.get('wpc_greenhouse'): position_list.append("WPC-Greenhouse")
-    if positions.get('wpc_nursery'): position_list.append("WPC-Nursery")
-    if positions.get('wpc_waterer'): position_list.append("WPC-Waterer/Production")
-    if positions.get('wpc_admin'): position_list.append("WPC-Administration")
-    if positions.get('land_designer'): position_list.append("Landscaping-Designer")
-    if positions.get('land_foreman'): position_list.append("Landscaping-Foreman")
-    if positions.get('land_installer'): position_list.append("Landscaping-Installer")
-    if positions.get('cafe_foh'): position_list.append("Cafe-FOH")
-    if positions.get('cafe_boh'): position_list.append("Cafe-BOH")
-    if positions.get('cafe_admin'): position_list.append("Cafe-Admin")
-    if positions.get('other'):
-        other_desc = positions.get('other_description', 'Not specified')
-        position_list.append(f"Other: {other_desc}")
-    
-    return ", ".join(position_list)
+def get_drive_upload_stats():
+    """
+    Counters of successful Drive uploads
 
+    Returns:
+        dict: uploads, multipart, resumable, chunks, resumes, bytes, seconds,
+              mb_per_second (overall throughput)
+    """
+    with _drive_upload_lock:
+        stats = dict(_drive_upload_stats)
+    stats['mb_per_second'] = stats['bytes'] / stats['seconds'] / (1024 * 1024) if stats['seconds'] else None
+    return stats
 
-def format_hours_for_sheet(data):
-    """Format hours preference for sheet"""
-    hours = []
-    if data.get('hours_15_25'): hours.append("15-25")
-    if data.get('hours_30_40'): hours.append("30-40")
-    if data.get('hours_40_plus'): hours.append("40+")
-    return ", ".join(hours)
 
+# ------------------------------------------------------------------ #
+# RESUME DEDUPLICATION
+# ------------------------------------------------------------------ #
+# Applicants often submit again (a typo, a second position) with the same
+# resume.  Resumes are indexed by the SHA-256 of the file the applicant
+# uploaded (optimizing a resume does not give the same bytes twice): a
+# repeat is answered with the existing Drive file's link and nothing is
+# uploaded.  An entry older than RESUME_VERIFY_HOURS is checked against
+# Drive first (the file may have been deleted, trashed or replaced) and
+# dropped if it is gone.
+_resume_index = {}      # sha256 -> {'file_id', 'name', 'verified', 'sha256' of the Drive file}
+_resume_index_state = {'loaded': False, 'hits': 0, 'misses': 0, 'stale': 0}
+_resume_index_lock = threading.Lock()
 
-def send_application_to_sheet(data):
+
+def _load_resume_index():
+    """Read RESUME_INDEX_PATH once (call with the lock held)"""
+    if _resume_index_state['loaded']:
+        return
+    _resume_index_state['loaded'] = True
+    if not RESUME_INDEX_PATH or not os.path.exists(RESUME_INDEX_PATH):
+        return
+    try:
+        with open(RESUME_INDEX_PATH, encoding='utf-8') as f:
+            _resume_index.update(json.load(f))
+        print(f">>> Resume index: {len(_resume_index)} entries from {RESUME_INDEX_PATH}")
+    except (OSError, ValueError) as e:
+        print(f">>> WARNING: Could not read resume index {RESUME_INDEX_PATH}, starting empty: {e}")
+
+
+def _save_resume_index():
+    """Write the index to RESUME_INDEX_PATH atomically (call with the lock held)"""
+    if not RESUME_INDEX_PATH:
+        return
+    temp_path = f"{RESUME_INDEX_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(_resume_index, f)
+        os.replace(temp_path, RESUME_INDEX_PATH)
+    except OSError as e:
+        print(f">>> WARNING: Could not save resume index {RESUME_INDEX_PATH}: {e}")
+
+
+def _drive_file_exists(file_id, checksum):
     """
-    Send application data to Google Sheet
+    True if the file is still in Drive, not trashed, with the same content
+    (SHA-256 checksum of the bytes that were uploaded)
+
+    Returns None if Drive couldn't be asked (the entry is kept unverified).
     """
     try:
-        client = get_gspread_client()
-        workbook = client.open_by_key(SHEET_ID)
-        worksheet = workbook.worksheet(WORKSHEET_NAME)
-        
-        # Prepare employer data (up to 3 employers)
-        employers = data.get('employers', [])
-        employer_data = []
-        for i in range(3):
-            if i < len(employers):
-                emp = employers[i]
-                employer_data.extend([
-                    emp.get('employer', ''),
-                    emp.get('location', ''),
-                    emp.get('hire_date', ''),
-                    emp.get('end_date', ''),
-                    emp.get('position', ''),
-                    emp.get('pay_rate', ''),
-                    emp.get('reason', '')
-                ])
+        with drive_service() as service:
+            info = call_google_api('drive', service.files().get(
+                fileId=file_id, fields="id,trashed,sha256Checksum", supportsAllDrives=True,
+            ).execute)
+    except Exception as e:
+        if error_status(e) == 404:
+            return False
+        print(f">>> WARNING: Could not verify Drive file {file_id}, reusing it: {e}")
+        return None
+    return not info.get('trashed') and info.get('sha256Checksum', checksum) == checksum
+
+
+def upload_resume_to_drive(resume_bytes, filename, mimetype="application/octet-stream", folder=None,
+                           digest=None):
+    """
+    Upload a resume to Drive unless the same file was uploaded before
+
+    Args:
+        resume_bytes: The resume to upload (after optimization)
+        filename: Name for a new Drive file
+        mimetype: Content type of the resume
+        folder: Subfolder for a new Drive file, from drive_folder_name()
+        digest: SHA-256 hex digest of the resume as the applicant uploaded
+            it, before optimization; the index key (default: of resume_bytes)
+
+    Returns:
+        str: URL to the (new or existing) file, or empty string if failed
+    """
+    try:
+        checksum = hashlib.sha256(resume_bytes).hexdigest()
+        digest = digest or checksum
+        with _resume_index_lock:
+            _load_resume_index()
+            entry = _resume_index.get(digest)
+
+        if entry:
+            if time.time() - entry['verified'] < RESUME_VERIFY_HOURS * 3600:
+                exists = True
             else:
-                employer_data.extend(['', '', '', '', '', '', ''])
-        
-        # Prepare reference data (up to 3 references)
-        references = data.get('references', [])
-        reference_data = []
-        for i in range(3):
-            if i < len(references):
-                ref = references[i]
-                reference_data.extend([
-                    ref.get('name', ''),
-                    ref.get('contact', ''),
-                    ref.get('relationship', '')
-                ])
+                exists = _drive_file_exists(entry['file_id'], entry.get('sha256', digest))
+                if exists:
+                    with _resume_index_lock:
+                        entry['verified'] = time.time()
+                        _save_resume_index()
+            if exists is not False:
+                with _resume_index_lock:
+                    _resume_index_state['hits'] += 1
+                print(f">>> Resume already in Drive as {entry['name']} ({digest[:12]}), not uploaded again")
+                return drive_file_link(entry['file_id'])
+
+            print(f">>> Resume {entry['name']} is no longer in Drive, uploading again")
+            with _resume_index_lock:
+                _resume_index_state['stale'] += 1
+                _resume_index.pop(digest, None)
+
+        file_id = _upload_file(io.BytesIO(resume_bytes), filename, mimetype, folder)
+        with _resume_index_lock:
+            _resume_index_state['misses'] += 1
+            _resume_index[digest] = {
+                'file_id': file_id, 'name': filename, 'verified': time.time(), 'sha256': checksum,
+            }
+            _save_resume_index()
+        return drive_file_link(file_id)
+
+    except Exception as e:
+        st.error(f"Failed to upload resume to Google Drive: {e}")
+        return ""
+
+
+def get_resume_index_stats():
+    """
+    Counters of the resume index
+
+    Returns:
+        dict: entries, hits (uploads avoided), misses (uploaded), stale (gone from Drive)
+    """
+    with _resume_index_lock:
+        stats = {key: value for key, value in _resume_index_state.items() if key != 'loaded'}
+        stats['entries'] = len(_resume_index)
+    return stats
+
+
+# ------------------------------------------------------------------ #
+# WORKSHEET HANDLES
+# ------------------------------------------------------------------ #
+# Opening the workbook and a worksheet are two metadata calls, and the
+# header row a third; they are made once per SHEET_HANDLE_TTL instead of
+# per submission.  A handle is dropped after any failed write, and
+# reopened at once if its worksheet was renamed or recreated.  Each entry
+# also holds the worksheet's next free row (cursor mode and row sharding).
+_workbook_cache = {'workbook': None, 'opened': 0.0}
+_worksheet_cache = {}   # title -> {'worksheet', 'headers', 'opened', 'next_row'}
+_worksheet_lock = threading.Lock()
+
+# Newest "rows" shard, once looked up
+_row_shard = {'title': None}
+
+
+def _get_workbook(refresh=False):
+    """The spreadsheet handle, cached for SHEET_HANDLE_TTL"""
+    with _worksheet_lock:
+        if (not refresh and _workbook_cache['workbook'] is not None
+                and time.monotonic() - _workbook_cache['opened'] < SHEET_HANDLE_TTL):
+            return _workbook_cache['workbook']
+
+    workbook = call_google_api('sheets_read', get_gspread_client().open_by_key, SHEET_ID)
+    with _worksheet_lock:
+        _workbook_cache.update(workbook=workbook, opened=time.monotonic())
+    return workbook
+
+
+def _read_headers(worksheet):
+    """Row 1 of the worksheet, or SHEET_COLUMNS if it doesn't hold the standard headers"""
+    headers = call_google_api('sheets_read', worksheet.row_values, 1)
+    present = {normalize_header(header) for header in headers}
+    missing = [header for header in SHEET_COLUMNS if normalize_header(header) not in present]
+
+    if len(missing) > len(SHEET_COLUMNS) // 2:
+        print(f">>> WARNING: Row 1 of worksheet {worksheet.title} doesn't have the standard headers, "
+              f"writing columns in the standard order")
+        return list(SHEET_COLUMNS)
+    if missing:
+        print(f">>> WARNING: Worksheet {worksheet.title} has no column for: {', '.join(missing)} (not written)")
+    return headers
+
+
+def _create_shard(workbook, title):
+    """Add a worksheet with the main worksheet's header row"""
+    _, headers = get_worksheet()
+    print(f">>> Creating worksheet {title}")
+    worksheet = call_google_api(
+        'sheets_write', workbook.add_worksheet, title=title, rows=SHEET_GROW_ROWS + 1, cols=len(headers),
+        idempotent=False,
+    )
+    call_google_api('sheets_write', worksheet.update, range_name="A1", values=[headers], value_input_option='RAW')
+    with _sheet_writer_lock:
+        _sheet_writer_stats['shards_created'] += 1
+    return worksheet, headers
+
+
+def get_worksheet(title=None, refresh=False, create=False):
+    """
+    Return a worksheet and its header row, cached for SHEET_HANDLE_TTL
+
+    Args:
+        title: Worksheet title; defaults to WORKSHEET_NAME
+        refresh: Reopen even if the cached handle is still fresh
+        create: Create the worksheet (a shard) if it doesn't exist
+
+    Returns:
+        tuple: (gspread Worksheet, list of column headers)
+    """
+    title = title or WORKSHEET_NAME
+    with _worksheet_lock:
+        entry = _worksheet_cache.get(title)
+        if not refresh and entry and time.monotonic() - entry['opened'] < SHEET_HANDLE_TTL:
+            return entry['worksheet'], entry['headers']
+
+    workbook = _get_workbook(refresh)
+    try:
+        worksheet = call_google_api('sheets_read', workbook.worksheet, title)
+        headers = _read_headers(worksheet)
+    except Exception as e:
+        if not (create and _is_stale_handle_error(e)):
+            raise
+        worksheet, headers = _create_shard(workbook, title)
+
+    with _worksheet_lock:
+        _worksheet_cache[title] = {
+            'worksheet': worksheet,
+            'headers': headers,
+            'opened': time.monotonic(),
+            'next_row': None,
+        }
+    return worksheet, headers
+
+
+def invalidate_worksheet(title=None):
+    """Forget a cached worksheet handle, headers and row cursor (all of them if no title)"""
+    with _worksheet_lock:
+        if title is None:
+            _worksheet_cache.clear()
+            _workbook_cache.update(workbook=None, opened=0.0)
+            _row_shard['title'] = None
+        else:
+            _worksheet_cache.pop(title, None)
+
+
+def _sync_row_cursor(worksheet, headers):
+    """Set the cursor below the last filled row of the First Name column"""
+    names = {normalize_header(header): i for i, header in enumerate(headers)}
+    column = names.get(normalize_header("First Name"), 0) + 1
+    next_row = max(len(call_google_api('sheets_read', worksheet.col_values, column)) + 1, 2)
+    with _worksheet_lock:
+        _worksheet_cache[worksheet.title]['next_row'] = next_row
+    return next_row
+
+
+def _reserve_rows(worksheet, headers, count):
+    """Take the next count rows from the cursor; returns the first row number"""
+    with _worksheet_lock:
+        next_row = _worksheet_cache[worksheet.title]['next_row']
+    if next_row is None:
+        _sync_row_cursor(worksheet, headers)
+
+    with _worksheet_lock:
+        entry = _worksheet_cache[worksheet.title]
+        first_row = entry['next_row']
+        entry['next_row'] = first_row + count
+    return first_row
+
+
+def _write_rows_at_cursor(worksheet, headers, rows):
+    """
+    Write rows to an explicit range at the row cursor
+
+    The target range is checked to be empty first (a small, fixed-size
+    read).  If rows there are taken (another writer got there, or a row
+    has no First Name so the cursor sync missed it), the cursor moves past
+    them, and on a second conflict below everything in the worksheet.
+    """
+    from gspread.utils import rowcol_to_a1
+
+    for attempt in range(3):
+        first_row = _reserve_rows(worksheet, headers, len(rows))
+        last_row = first_row + len(rows) - 1
+        if last_row > worksheet.row_count:
+            call_google_api(
+                'sheets_write', worksheet.add_rows, max(SHEET_GROW_ROWS, last_row - worksheet.row_count),
+                idempotent=False,
+            )
+
+        target = f"{rowcol_to_a1(first_row, 1)}:{rowcol_to_a1(last_row, len(headers))}"
+        taken = [i for i, row in enumerate(call_google_api('sheets_read', worksheet.get, target)) if any(row)]
+        if taken:
+            with _sheet_writer_lock:
+                _sheet_writer_stats['cursor_conflicts'] += 1
+            if attempt == 0:
+                # Past the taken rows, or the First Name column's end if that is further
+                next_row = max(_sync_row_cursor(worksheet, headers), first_row + taken[-1] + 1)
             else:
-                reference_data.extend(['', '', ''])
-        
-        # Prepare row data (66 columns total)
-        row_data = [
-            # Columns 1-10: Basic info
-            data.get('first_name', ''),
-            data.get('last_name', ''),
-            data.get('email', ''),
-            data.get('phone', ''),
-            data.get('alternate_phone', ''),
-            data.get('dob', ''),
-            data.get('street_address', ''),
-            data.get('city', ''),
-            data.get('state', ''),
-            data.get('zip', ''),
-            
-            # Columns 11-13: Interview schedule
-            data.get('location', ''),
-            data.get('date', ''),
-            data.get('time_slot', ''),
-            
-            # Columns 14-20: Position and availability info
-            format_positions_for_sheet(data.get('positions', {})),
-            format_hours_for_sheet(data),
-            data.get('expected_payrate', ''),
-            data.get('availability_restrictions', ''),
-            data.get('start_date', ''),
-            data.get('why_applying', ''),
-            data.get('special_training', ''),
-            
-            # Columns 21-27: Legal info
-            data.get('legally_entitled', ''),
-            data.get('perform_duties', ''),
-            data.get('drug_test', ''),
-            data.get('background_check', ''),
-            data.get('drivers_license', ''),
-            data.get('reliable_transport', ''),
-            data.get('submission_timestamp', ''),
-        ]
-        
-        # Columns 28-48: Add employer data (3 employers x 7 fields)
-        row_data.extend(employer_data)
-        
-        # Columns 49-56: Education
-        row_data.extend([
-            data.get('college_name', ''),
-            data.get('college_study', ''),
-            data.get('college_graduated', ''),
-            data.get('college_completion', ''),
-            data.get('hs_name', ''),
-            data.get('hs_study', ''),
-            data.get('hs_graduated', ''),
-            data.get('hs_completion', '')
-        ])
-        
-        # Columns 57-65: Add reference data (3 references x 3 fields)
-        row_data.extend(reference_data)
-        
-        # Column 66: PDF Link
-        row_data.append(data.get('pdf_link', ''))
-        
-        # Append row to sheet
-        worksheet.append_row(row_data, value_input_option='USER_ENTERED')
-        
+                # Still taken: below the last row with anything in it
+                next_row = len(call_google_api('sheets_read', worksheet.get_all_values)) + 1
+            print(f">>> Sheets: rows {target} of {worksheet.title} are already taken, "
+                  f"moving the row cursor to row {next_row}")
+            with _worksheet_lock:
+                _worksheet_cache[worksheet.title]['next_row'] = next_row
+            continue
+
+        call_google_api(
+            'sheets_write', worksheet.update, range_name=target, values=rows, value_input_option='USER_ENTERED',
+        )
+        return
+
+    raise RuntimeError(f"No free rows found in worksheet {worksheet.title} after re-syncing the cursor")
+
+
+def _add_rows(worksheet, headers, records):
+    """Add records to the worksheet the way SHEET_WRITE_MODE says"""
+    rows = [record_to_row(record, headers) for record in records]
+    if SHEET_WRITE_MODE == "cursor":
+        _write_rows_at_cursor(worksheet, headers, rows)
+        return
+
+    # A 5xx on an append may still have added the rows: only quota errors are retried
+    call_google_api(
+        'sheets_write', worksheet.append_rows, rows, value_input_option='USER_ENTERED', idempotent=False,
+    )
+    # Keep a synced cursor counting, for row sharding
+    with _worksheet_lock:
+        entry = _worksheet_cache.get(worksheet.title)
+        if entry and entry['next_row'] is not None:
+            entry['next_row'] += len(rows)
+
+
+def _is_stale_handle_error(error):
+    """True if the worksheet no longer exists under that id (renamed, deleted, recreated)"""
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status == 404 or type(error).__name__ == 'WorksheetNotFound'
+
+
+# ------------------------------------------------------------------ #
+# WORKSHEET SHARDS
+# ------------------------------------------------------------------ #
+def _safe_title(text):
+    """Sheet titles can't contain []*?:/\\ and are limited to 100 characters"""
+    return re.sub(r"[\[\]*?:/\\]+", "-", text).strip()[:80]
+
+
+def event_date_name(date):
+    """
+    Shard and subfolder name for an interview date (event_date sharding)
+
+    Args:
+        date: The submission's 'date', normally the ISO date value from
+            SCHEDULING_CONFIG, e.g. "2026-02-18"
+
+    Returns:
+        str: The name, or "" without a date
+    """
+    return _safe_title(str(date or ''))
+
+
+def sheet_shard_title(data):
+    """
+    Worksheet a submission belongs in under SHEET_SHARDING
+
+    Returns:
+        str: Worksheet title, or None for "rows" sharding (decided when written)
+    """
+    if SHEET_SHARDING == "month":
+        return f"{WORKSHEET_NAME} {time.strftime('%Y-%m')}"
+    if SHEET_SHARDING == "event_date":
+        date = event_date_name(data.get('date'))
+        return f"{WORKSHEET_NAME} {date}" if date else WORKSHEET_NAME
+    if SHEET_SHARDING == "rows":
+        return None
+    return WORKSHEET_NAME
+
+
+def _shard_number(title):
+    """2 for "<WORKSHEET_NAME> (2)", 1 for WORKSHEET_NAME, None for other titles"""
+    if title == WORKSHEET_NAME:
+        return 1
+    match = re.fullmatch(rf"{re.escape(WORKSHEET_NAME)} \((\d+)\)", title)
+    return int(match.group(1)) if match else None
+
+
+def _is_shard_title(title):
+    """True for WORKSHEET_NAME and titles sheet_shard_title() gives under SHEET_SHARDING"""
+    if title == WORKSHEET_NAME:
         return True
+    if SHEET_SHARDING == "month":
+        return re.fullmatch(rf"{re.escape(WORKSHEET_NAME)} \d{{4}}-\d{{2}}", title) is not None
+    if SHEET_SHARDING == "event_date":
+        # ISO dates, including events since dropped from SCHEDULING_CONFIG,
+        # and whatever names the configured dates' values or labels give
+        if re.fullmatch(rf"{re.escape(WORKSHEET_NAME)} \d{{4}}-\d{{2}}-\d{{2}}", title):
+            return True
+        from application_scheduling import SCHEDULING_CONFIG
+        return title in {
+            f"{WORKSHEET_NAME} {event_date_name(date[key])}"
+            for date in SCHEDULING_CONFIG['dates'] for key in ('value', 'display')
+        }
+    if SHEET_SHARDING == "rows":
+        return _shard_number(title) is not None
+    return False
+
+
+def get_shard_titles():
+    """
+    Titles of WORKSHEET_NAME and its shards under SHEET_SHARDING, in
+    workbook order (other worksheets, e.g. "<WORKSHEET_NAME> notes", are left out)
+    """
+    return [
+        worksheet.title for worksheet in call_google_api('sheets_read', _get_workbook().worksheets)
+        if _is_shard_title(worksheet.title)
+    ]
+
+
+def _current_row_shard(pending=0):
+    """
+    Newest "rows" shard, moving on to a new one once it holds SHEET_SHARD_ROWS applicants
+
+    Args:
+        pending: Rows of the current batch already routed to the newest shard
+    """
+    with _worksheet_lock:
+        title = _row_shard['title']
+    if title is None:
+        numbers = [n for n in map(_shard_number, get_shard_titles()) if n]
+        number = max(numbers, default=1)
+        title = WORKSHEET_NAME if number == 1 else f"{WORKSHEET_NAME} ({number})"
+
+    worksheet, headers = get_worksheet(title, create=True)
+    with _worksheet_lock:
+        next_row = _worksheet_cache[title]['next_row']
+    if next_row is None:
+        next_row = _sync_row_cursor(worksheet, headers)
+
+    # Row 1 holds the headers
+    if next_row - 2 + pending >= SHEET_SHARD_ROWS:
+        title = f"{WORKSHEET_NAME} ({_shard_number(title) + 1})"
+        print(f">>> Sheets: {worksheet.title} is full ({SHEET_SHARD_ROWS} rows), moving on to {title}")
+        get_worksheet(title, create=True)
+
+    with _worksheet_lock:
+        _row_shard['title'] = title
+    return title
+
+
+def read_sheet_records(titles=None):
+    """
+    Read applicant rows from WORKSHEET_NAME and all of its shards
+
+    Args:
+        titles: Worksheets to read; defaults to get_shard_titles()
+
+    Returns:
+        list: (worksheet title, record) pairs; records are keyed by the
+        standard header names (see application_sheet_columns)
+    """
+    records = []
+    for title in titles or get_shard_titles():
+        worksheet, headers = get_worksheet(title)
+        for row in call_google_api('sheets_read', worksheet.get_all_values)[1:]:
+            if any(cell.strip() for cell in row):
+                records.append((title, row_to_record(row, headers)))
+    return records
+
+
+# ------------------------------------------------------------------ #
+# BATCHED SHEET WRITER
+# ------------------------------------------------------------------ #
+# At job-fair peaks one append_row per applicant used up the Sheets
+# per-minute write quota.  Submissions now queue their record with a
+# Future, and a single writer thread appends everything queued within
+# SHEET_BATCH_MS with one call per worksheet; each submitter still gets
+# its own result.  Records are laid out by the worksheet's header row at
+# write time.
+_sheet_queue = queue.Queue()
+_sheet_writer = None
+_sheet_writer_lock = threading.Lock()
+
+_sheet_writer_stats = {
+    'rows': 0,
+    'batches': 0,
+    'failed_rows': 0,
+    'largest_batch': 0,
+    'cursor_conflicts': 0,
+    'shards_created': 0,
+}
+
+
+def _write_sheet_rows(title, items):
+    """Add (record, future) pairs to one worksheet with one API call and settle the futures"""
+    start = time.perf_counter()
+    try:
+        records = [record for record, _ in items]
+        create = SHEET_SHARDING != "none"
+        worksheet, headers = get_worksheet(title, create=create)
+        try:
+            _add_rows(worksheet, headers, records)
+        except Exception as e:
+            if not _is_stale_handle_error(e):
+                raise
+            # Nothing was written; reopen by name and try once more
+            print(f">>> Worksheet handle is stale ({e}), reopening {worksheet.title}")
+            worksheet, headers = get_worksheet(title, refresh=True, create=create)
+            _add_rows(worksheet, headers, records)
+    except Exception as e:
+        invalidate_worksheet(title)
+        with _worksheet_lock:
+            _row_shard['title'] = None
+        print(f">>> ERROR: Sheets write of {len(items)} rows to {title} failed: {e}")
+        print(traceback.format_exc())
+        with _sheet_writer_lock:
+            _sheet_writer_stats['failed_rows'] += len(items)
+        for _, future in items:
+            future.set_exception(e)
+        return
+
+    print(f">>> Sheets: wrote {len(items)} rows to {worksheet.title} in one call, {SHEET_WRITE_MODE} mode "
+          f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+    with _sheet_writer_lock:
+        _sheet_writer_stats['rows'] += len(items)
+        _sheet_writer_stats['batches'] += 1
+        _sheet_writer_stats['largest_batch'] = max(_sheet_writer_stats['largest_batch'], len(items))
+    for _, future in items:
+        future.set_result(True)
+
+
+def _write_sheet_batch(batch):
+    """Write a batch of (record, worksheet title, future), one API call per worksheet"""
+    by_title = {}
+    for record, title, future in batch:
+        if title is None:
+            try:
+                title = _current_row_shard(len(by_title.get(_row_shard['title'], ())))
+            except Exception as e:
+                print(f">>> ERROR: Could not pick a worksheet shard: {e}")
+                print(traceback.format_exc())
+                future.set_exception(e)
+                continue
+        by_title.setdefault(title, []).append((record, future))
+
+    for title, items in by_title.items():
+        _write_sheet_rows(title, items)
+
+
+def _sheet_writer_loop():
+    """Collect queued rows into batches and write them, forever"""
+    while True:
+        batch = [_sheet_queue.get()]
+        deadline = time.monotonic() + SHEET_BATCH_MS / 1000
+        while len(batch) < max(1, SHEET_BATCH_ROWS):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_sheet_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            _write_sheet_batch(batch)
+        except Exception as e:
+            # Never let the writer die with submitters waiting on it
+            print(f">>> ERROR: Sheet writer: {e}")
+            print(traceback.format_exc())
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
+def queue_sheet_record(record, title=None):
+    """
+    Queue a record from build_sheet_record() for the background writer,
+    starting it on first use
+
+    Args:
+        record: Header -> value map
+        title: Worksheet from sheet_shard_title(); None picks the current "rows" shard
+
+    Returns:
+        Future: Resolves to True once the row is written, or raises the
+        API error of the batch it was part of
+    """
+    global _sheet_writer
+
+    with _sheet_writer_lock:
+        if _sheet_writer is None or not _sheet_writer.is_alive():
+            _sheet_writer = threading.Thread(target=_sheet_writer_loop, name="sheet-writer", daemon=True)
+            _sheet_writer.start()
+
+    future = Future()
+    _sheet_queue.put((record, title, future))
+    return future
+
+
+def get_sheet_writer_stats():
+    """
+    Counters of the batched writer
+
+    Returns:
+        dict: rows, batches, failed_rows, largest_batch, cursor_conflicts,
+              shards_created, rows_per_batch, queued
+    """
+    with _sheet_writer_lock:
+        stats = dict(_sheet_writer_stats)
+    stats['rows_per_batch'] = stats['rows'] / stats['batches'] if stats['batches'] else None
+    stats['queued'] = _sheet_queue.qsize()
+    return stats
+
+
+def send_application_to_sheet(data):
+    """
+    Send application data to Google Sheet
+
+    The row is written by the batched writer (to the worksheet shard it
+    belongs in); this waits for its result.
+    """
+    try:
+        future = queue_sheet_record(build_sheet_record(data), sheet_shard_title(data))
+        return future.result(timeout=SHEET_WRITE_TIMEOUT)
         
     except Exception as e:
-        st.error(f"Failed to send to Google Sheet: {e}")
-        return False
\ No newline at end of file
+        st.error(f"Failed to send to Google Sheet: {e or type(e).__name__}")
+        return False
@@ -0,0 +1,57 @@
+# compile_pdf_template.py
+# Build step: compile the PDF template's form into an overlay layout
+#
+# Re-run this whenever application_template.pdf changes:
+#   python compile_pdf_template.py [template.pdf] [-o layout.json]
+#   python compile_pdf_template.py --all    (every registered template)
+#
+# The generator's "overlay" engine reads the layout (page, rect, font size,
+# max length of each field it fills, plus the signature rect) and stamps
+# text straight onto the page content instead of filling the AcroForm.
+# If the layout is missing or was compiled from a different template, the
+# generator compiles it in memory at startup and prints a warning.
+
+import argparse
+import json
+
+import application_pdf_generator as generator
+
+
+def compile_template(template_path, output_path=None):
+    """Compile one template and report what was found"""
+    output_path = output_path or generator.default_layout_path(template_path)
+    layout = generator.compile_template_layout(template_path)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(layout, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+    placements = sum(len(p) for p in layout['fields'].values())
+    print(f"Compiled {template_path} -> {output_path}")
+    print(f"  Fields:    {len(layout['fields'])} ({placements} placements)")
+    print(f"  Signature: {layout['signature'] or 'not found - DEFAULT_SIGNATURE_RECT will be used'}")
+
+    missing = sorted(set(generator.build_pdf_field_values({})) - set(layout['fields']))
+    if missing:
+        print(f"  Not in template (skipped): {', '.join(missing)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a PDF template into an overlay layout")
+    parser.add_argument('template', nargs='?', default=generator.TEMPLATE_PATH)
+    parser.add_argument('-o', '--output', help="layout file (default: next to the template)")
+    parser.add_argument('--all', action='store_true', help="compile every template in the registry")
+    args = parser.parse_args()
+
+    if not args.all:
+        compile_template(args.template, args.output)
+        return
+
+    _, entries = generator.get_template_registry()
+    for entry in entries:
+        print(f"[{entry['id']}]")
+        compile_template(entry['path'])
+
+
+if __name__ == "__main__":
+    main()
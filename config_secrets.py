@@ -90,4 +90,12 @@ def get_sheet_config():
         'sheet_id': get_secret('gcp.sheet_id', '1QZ5gO5farg4E03dhaSINJljvn6qfocUgvHH4tjOSkIc'),
         'worksheet_name': get_secret('gcp.worksheet_name', '2026'),
         'pdf_folder_id': get_secret('gcp.pdf_folder_id', '1X5crtAwvuIgmgrGOSUR9M1gq21e0oUwh')
-    }
\ No newline at end of file
+    }
+
+@st.cache_data
+def get_template_config():
+    """Get which PDF template the app uses (see application_pdf_generator.resolve_template). Cached."""
+    return {
+        'event': get_secret('pdf.template_event'),
+        'year': get_secret('pdf.template_year', get_sheet_config()['worksheet_name']),
+    }
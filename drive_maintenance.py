@@ -0,0 +1,327 @@
+# drive_maintenance.py
+# Bulk housekeeping of the Drive PDF folder
+#
+# USAGE:
+#   python drive_maintenance.py purge --older-than-days 365 [--delete] [--dry-run]
+#   python drive_maintenance.py shard [--dry-run]
+#   python drive_maintenance.py relabel --set retain=yes --name-contains "Smith"
+#   python drive_maintenance.py relabel --unset retain --folder 2026-03
+#
+# Commands:
+#   purge    trash (or with --delete, permanently delete) application PDFs
+#            and resumes past the retention window.  Files labeled
+#            retain=yes are never purged.
+#   shard    move files sitting directly in the PDF folder into month
+#            subfolders ("2026-03", by upload date), the layout uploads use
+#            with DRIVE_FOLDER_SHARDING=month
+#   relabel  set or remove custom properties (labels) on files
+#
+# Files are selected from the PDF folder and all of its subfolders (or one
+# subfolder with --folder), optionally by age and name.  The changes are
+# sent as Drive batch requests of up to 100 files per HTTP round trip
+# instead of one call per file.  Each file in a batch still counts against
+# the Drive quota, so batches are paced by application_api_limiter; files
+# that hit a quota or server error are retried in the next round.
+#
+# Needs the app's secrets, like the app itself.  The exit status is 1 if any
+# file could not be changed.
+
+import argparse
+import datetime
+import random
+import sys
+import time
+import traceback
+
+import application_api_limiter as limiter
+
+# Most requests Drive accepts in one batch
+MAX_BATCH_SIZE = 100
+
+# Label that exempts a file from purge
+RETAIN_PROPERTY = ('retain', 'yes')
+
+# Rounds of retrying files that failed with a quota or server error
+RETRY_ROUNDS = 5
+
+
+# ------------------------------------------------------------------ #
+# SELECTING FILES
+# ------------------------------------------------------------------ #
+def find_files(args, extra_query=None, top_only=False):
+    """
+    Files in the PDF folder and its subfolders matching the command line filters
+
+    Args:
+        extra_query: Another Drive query condition the files must meet
+        top_only: Only files directly in the PDF folder, not in subfolders
+
+    Returns:
+        list: File resources with id, name, createdTime, parents and properties
+    """
+    from application_sheets_manager import (
+        DRIVE_FOLDER_MIMETYPE,
+        PDF_FOLDER_ID,
+        drive_query_value,
+        list_drive_files,
+        list_drive_folders,
+    )
+
+    subfolders = {} if top_only else list_drive_folders()
+    if args.folder:
+        if args.folder not in subfolders:
+            raise SystemExit(f"ERROR: No subfolder named {args.folder!r} in the PDF folder")
+        folders = {args.folder: subfolders[args.folder]}
+    else:
+        folders = {'(top)': PDF_FOLDER_ID, **subfolders}
+
+    conditions = [f"mimeType != {drive_query_value(DRIVE_FOLDER_MIMETYPE)}", "trashed = false"]
+    if args.older_than_days is not None:
+        cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=args.older_than_days)
+        conditions.append(f"createdTime < {drive_query_value(cutoff.strftime('%Y-%m-%dT%H:%M:%S'))}")
+    if args.name_contains:
+        conditions.append(f"name contains {drive_query_value(args.name_contains)}")
+    if extra_query:
+        conditions.append(extra_query)
+
+    files = []
+    for name, folder_id in folders.items():
+        query = " and ".join([f"{drive_query_value(folder_id)} in parents", *conditions])
+        found = list_drive_files(query, fields="id,name,createdTime,parents,properties")
+        print(f"  {name}: {len(found)} files", file=sys.stderr)
+        files.extend(found)
+
+    files.sort(key=lambda file: file.get('createdTime', ''))
+    return files[:args.limit] if args.limit is not None else files
+
+
+# ------------------------------------------------------------------ #
+# BATCHED CHANGES
+# ------------------------------------------------------------------ #
+def run_batched(changes, batch_size, label):
+    """
+    Send per-file requests as Drive batch requests
+
+    Args:
+        changes: (file, function(service) -> request) pairs
+        batch_size: Requests per batch (at most MAX_BATCH_SIZE)
+        label: Verb for progress output ("trashed", "moved", ...)
+
+    Returns:
+        tuple: (number done, list of (file, error message) that failed)
+    """
+    from application_sheets_manager import drive_service
+
+    done = 0
+    failed = []
+    pending = list(changes)
+    start = time.perf_counter()
+
+    for round_number in range(RETRY_ROUNDS + 1):
+        retry = []
+        for first in range(0, len(pending), batch_size):
+            chunk = pending[first:first + batch_size]
+            errors = {}
+
+            def collect(request_id, response, exception):
+                errors[request_id] = exception
+
+            try:
+                with drive_service() as service:
+                    batch = service.new_batch_http_request(callback=collect)
+                    for i, (_, make_request) in enumerate(chunk):
+                        batch.add(make_request(service), request_id=str(i))
+                    limiter.call_google_api('drive', batch.execute, cost=len(chunk))
+            except Exception as e:
+                # The whole batch failed (after the limiter's retries)
+                print(traceback.format_exc(), file=sys.stderr)
+                failed.extend((file, f"Batch failed: {e}") for file, _ in chunk)
+                continue
+
+            for i, change in enumerate(chunk):
+                error = errors.get(str(i))
+                if error is None:
+                    done += 1
+                elif limiter.is_retryable_error(error) and round_number < RETRY_ROUNDS:
+                    retry.append(change)
+                else:
+                    failed.append((change[0], str(error)))
+
+            seconds = time.perf_counter() - start
+            print(f"  {done} {label}, {len(failed)} failed, {len(retry)} to retry "
+                  f"({done / seconds if seconds else 0:.1f} files/s)", file=sys.stderr)
+
+        if not retry:
+            break
+        # Some files hit the quota or a server error; back off and send those again
+        delay = random.uniform(0, min(limiter.GOOGLE_API_BACKOFF_MAX, limiter.GOOGLE_API_BACKOFF * 2 ** round_number))
+        print(f"  Retrying {len(retry)} files in {delay:.1f}s", file=sys.stderr)
+        time.sleep(delay)
+        pending = retry
+
+    return done, failed
+
+
+def describe(file):
+    return f"{file.get('createdTime', '')[:10]}  {file['name']}"
+
+
+def preview_changes(files, args, action):
+    """Print what would change; True if the command should go ahead"""
+    if not files:
+        print("No matching files")
+        return False
+    print(f"{len(files)} files to {action}:")
+    for file in files[:20]:
+        print(f"  {describe(file)}")
+    if len(files) > 20:
+        print(f"  ... and {len(files) - 20} more")
+    if args.dry_run:
+        print("Dry run, nothing changed")
+        return False
+    return True
+
+
+# ------------------------------------------------------------------ #
+# COMMANDS
+# ------------------------------------------------------------------ #
+def purge(args):
+    if args.older_than_days is None:
+        raise SystemExit("ERROR: purge needs --older-than-days")
+
+    from application_sheets_manager import drive_query_value
+
+    key, value = RETAIN_PROPERTY
+    retained = f"not properties has {{ key={drive_query_value(key)} and value={drive_query_value(value)} }}"
+    files = find_files(args, retained)
+    if not preview_changes(files, args, "delete permanently" if args.delete else "move to the trash"):
+        return 0, []
+
+    def make_trash(file):
+        return lambda service: service.files().update(
+            fileId=file['id'], body={'trashed': True}, fields="id", supportsAllDrives=True,
+        )
+
+    def make_delete(file):
+        return lambda service: service.files().delete(fileId=file['id'], supportsAllDrives=True)
+
+    make = make_delete if args.delete else make_trash
+    return run_batched([(file, make(file)) for file in files], args.batch_size,
+                       "deleted" if args.delete else "trashed")
+
+
+def shard(args):
+    from application_sheets_manager import PDF_FOLDER_ID, get_drive_folder
+
+    files = find_files(args, top_only=True)
+    if not preview_changes(files, args, "move into month subfolders"):
+        return 0, []
+
+    def make_move(file, folder_id):
+        return lambda service: service.files().update(
+            fileId=file['id'],
+            addParents=folder_id,
+            removeParents=PDF_FOLDER_ID,
+            fields="id",
+            supportsAllDrives=True,
+        )
+
+    changes = []
+    for file in files:
+        month = file.get('createdTime', '')[:7] or time.strftime('%Y-%m')
+        changes.append((file, make_move(file, get_drive_folder(month))))
+    return run_batched(changes, args.batch_size, "moved")
+
+
+def relabel(args):
+    properties = {}
+    for item in args.set or []:
+        key, separator, value = item.partition("=")
+        if not separator or not key:
+            raise SystemExit(f"ERROR: --set expects key=value, got {item!r}")
+        properties[key] = value
+    for key in args.unset or []:
+        # null removes a property
+        properties[key] = None
+    if not properties:
+        raise SystemExit("ERROR: relabel needs --set and/or --unset")
+
+    files = find_files(args)
+    if not preview_changes(files, args, f"relabel ({', '.join(f'{k}={v}' for k, v in properties.items())})"):
+        return 0, []
+
+    def make_relabel(file):
+        return lambda service: service.files().update(
+            fileId=file['id'], body={'properties': properties}, fields="id", supportsAllDrives=True,
+        )
+
+    return run_batched([(file, make_relabel(file)) for file in files], args.batch_size, "relabeled")
+
+
+# ------------------------------------------------------------------ #
+# MAIN
+# ------------------------------------------------------------------ #
+def main():
+    parser = argparse.ArgumentParser(description="Bulk housekeeping of the Drive PDF folder")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_command(name, func, help_text):
+        command = commands.add_parser(name, help=help_text)
+        command.set_defaults(func=func)
+        command.add_argument('--older-than-days', type=float, help="only files uploaded more than N days ago")
+        command.add_argument('--name-contains', help="only files whose name contains this text")
+        command.add_argument('--limit', type=int, help="at most N files (oldest first)")
+        command.add_argument('--dry-run', action='store_true', help="list the files, change nothing")
+        command.add_argument('--batch-size', type=int, default=MAX_BATCH_SIZE,
+                             help=f"files per batch request (at most {MAX_BATCH_SIZE})")
+        command.add_argument('--rate', type=int,
+                             help=f"Drive requests per minute (default {limiter.API_QUOTAS['drive']})")
+        return command
+
+    command = add_command('purge', purge, "trash or delete files past the retention window")
+    command.add_argument('--folder', help="only this subfolder of the PDF folder")
+    command.add_argument('--delete', action='store_true', help="delete permanently instead of trashing")
+    command = add_command('shard', shard, "move top-level files into month subfolders")
+    command.set_defaults(folder=None)
+    command = add_command('relabel', relabel, "set or remove file labels (custom properties)")
+    command.add_argument('--folder', help="only this subfolder of the PDF folder")
+    command.add_argument('--set', action='append', metavar="KEY=VALUE", help="label to set (repeatable)")
+    command.add_argument('--unset', action='append', metavar="KEY", help="label to remove (repeatable)")
+    args = parser.parse_args()
+
+    if not 1 <= args.batch_size <= MAX_BATCH_SIZE:
+        parser.error(f"--batch-size must be between 1 and {MAX_BATCH_SIZE}")
+    if args.rate:
+        limiter.API_QUOTAS['drive'] = args.rate
+    # A full batch may wait for its share of the quota; that's expected here
+    limiter.GOOGLE_API_MAX_WAIT = max(limiter.GOOGLE_API_MAX_WAIT,
+                                      args.batch_size * 60 / limiter.API_QUOTAS['drive'] * 2)
+
+    print("Listing files...", file=sys.stderr)
+    start = time.perf_counter()
+    try:
+        done, failed = args.func(args)
+    except SystemExit:
+        raise
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        print(traceback.format_exc(), file=sys.stderr)
+        raise SystemExit(2)
+
+    if done or failed:
+        print(f"\n{done} files changed, {len(failed)} failed in {time.perf_counter() - start:.1f}s")
+    for file, error in failed[:10]:
+        print(f"  {describe(file)}: {error}")
+    if len(failed) > 10:
+        print(f"  ... and {len(failed) - 10} more")
+
+    drive = limiter.get_api_limiter_stats().get('drive')
+    if drive and (drive['waits'] or drive['retries']):
+        print(f"Drive rate limit: waited {drive['wait_seconds']:.1f}s, {drive['retries']} retries")
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,667 @@
+# pdf_benchmark.py
+# Timing comparisons for the PDF generator
+#
+# USAGE:
+#   python pdf_benchmark.py engines [--runs 20] [--signature vector|raster]
+#   python pdf_benchmark.py sanitize [--runs 200]
+#   python pdf_benchmark.py profiles [--runs 10] [--engine overlay] [--signature vector|raster]
+#   python pdf_benchmark.py suite [--runs 50] [--concurrency 4] [--mode pool|threads]
+#                                 [--output results.json] [--compare old_results.json]
+#
+#   engines   Times generate_application_pdf() with every fill engine in
+#             application_pdf_generator.PDF_ENGINES on the same applicant.
+#   sanitize  Checks sanitize_for_pdf() / sanitize_fields() against the
+#             original replace-loop sanitizer on a corpus of messy input
+#             (smart quotes, emoji, RTL marks, ...) and times all three.
+#   profiles  Saves the same rendered application with every output profile
+#             in application_pdf_generator.PDF_OUTPUT_PROFILES and reports
+#             size and save time against the "fast" (deflate only) profile.
+#   suite     Full run on synthetic worst-case applicants (every text field at
+#             the sanitizer's length cap, 3 employers, 3 references) without a
+#             signature and with raster and vector signatures.  Reports wall
+#             time, CPU time, peak memory and output size with p50/p95/p99,
+#             single-threaded and with N concurrent callers, and writes JSON
+#             for comparing template or library changes (--compare).
+
+import argparse
+import base64
+import contextlib
+import datetime
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import unicodedata
+
+import application_pdf_generator as generator
+import application_pdf_pool as pdf_pool
+
+
+# ------------------------------------------------------------------ #
+# SAMPLE DATA
+# ------------------------------------------------------------------ #
+def make_signature_base64():
+    """Draw a simple stroke on a transparent canvas-sized PNG"""
+    from PIL import Image, ImageDraw
+
+    img = Image.new('RGBA', (400, 133), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.line([(20, 100), (90, 30), (160, 95), (240, 40), (380, 70)], fill=(0, 0, 0, 255), width=2)
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+def make_signature_strokes():
+    """The same stroke as make_signature_base64(), as canvas path commands"""
+    return [{
+        'width': 2,
+        'path': [['M', 20, 100], ['L', 90, 30], ['L', 160, 95], ['L', 240, 40], ['L', 380, 70]],
+    }]
+
+
+def make_sample_application(signature='raster'):
+    """A typical, fully filled application"""
+    data = {
+        'first_name': 'Jordan',
+        'last_name': 'Smith',
+        'email': 'jordan.smith@example.com',
+        'phone': '859-555-0100',
+        'alternate_phone': '859-555-0101',
+        'dob': '04/12/2004',
+        'street_address': '2700 Palumbo Drive',
+        'city': 'Lexington',
+        'state': 'KY',
+        'zip': '40509',
+        'positions': {'wpc_cashier': True, 'wpc_greenhouse': True, 'cafe_foh': True},
+        'schedule_preference': 'Part-time (under 30 hours/week)',
+        'expected_payrate': '$15/hour',
+        'availability_restrictions': 'Not available Sunday mornings',
+        'start_date': 'Two weeks notice required',
+        'why_applying': 'I love plants and would enjoy helping customers plan their gardens.',
+        'special_training': 'Horticulture classes; food handler certification.',
+        'legally_entitled': 'Yes',
+        'perform_duties': 'Yes',
+        'drug_test': 'Yes',
+        'background_check': 'Yes',
+        'drivers_license': 'Yes',
+        'reliable_transport': 'Yes',
+        'submission_timestamp': '2026-02-18 10:15:00',
+        'employers': [
+            {'employer': 'Green Thumb Nursery', 'location': 'Lexington, KY', 'hire_date': '05/2022',
+             'end_date': '12/2025', 'position': 'Sales Associate', 'pay_rate': '$13/hr', 'reason': 'Seasonal'},
+        ],
+        'college_name': 'BCTC, Lexington',
+        'college_study': 'Horticulture',
+        'college_graduated': 'No',
+        'college_completion': '05/2027',
+        'hs_name': 'Tates Creek HS, Lexington',
+        'hs_study': 'General',
+        'hs_graduated': 'Yes',
+        'hs_completion': '05/2022',
+        'references': [
+            {'name': 'Pat Lee', 'contact': '859-555-0199', 'relationship': 'Former supervisor'},
+        ],
+        'location': 'Lexington',
+        'date': '2026-02-18',
+        'time_slot': '10am-12pm',
+    }
+    if signature == 'vector':
+        data['signature_strokes'] = make_signature_strokes()
+        data['signature_size'] = [400, 133]
+    else:
+        data['signature_base64'] = make_signature_base64()
+    return data
+
+
+# Signature variants covered by the suite
+SUITE_SIGNATURES = ('none', 'raster', 'vector')
+
+SYNTHETIC_WORDS = (
+    "garden greenhouse customer \u201cservice\u201d nursery plants watering register "
+    "caf\u00e9 landscaping O\u2019Brien reliable team schedule weekends \u2013 seasonal "
+    "inventory (retail) & hospitality: experience\u2026 certified Lexington"
+).split()
+
+
+def make_synthetic_text(rng, length):
+    """Random words (with smart quotes and accents) up to length characters"""
+    words = []
+    total = 0
+    while total < length:
+        word = rng.choice(SYNTHETIC_WORDS)
+        words.append(word)
+        total += len(word) + 1
+    return ' '.join(words)[:length]
+
+
+def make_synthetic_strokes(rng, strokes=4, segments=60):
+    """A dense signature as canvas paths of quadratic curves, like st_canvas emits"""
+    objects = []
+    for stroke in range(strokes):
+        x, y = 20 + stroke * 90, rng.uniform(40, 100)
+        path = [['M', x, y]]
+        for _ in range(segments):
+            cx, cy = x + rng.uniform(0, 3), y + rng.uniform(-8, 8)
+            x, y = min(x + rng.uniform(0, 2), 390), min(max(y + rng.uniform(-6, 6), 5), 128)
+            path.append(['Q', cx, cy, x, y])
+        path.append(['L', x, y])
+        objects.append({'width': 2, 'path': path})
+    return objects
+
+
+def make_synthetic_application(signature='none', seed=0):
+    """
+    A worst-case application: every text field at the sanitizer's length
+    cap, every position checked, 3 employers and 3 references
+    """
+    import random
+
+    rng = random.Random(seed)
+    max_length = generator._MAX_FIELD_LENGTH
+
+    def text():
+        return make_synthetic_text(rng, max_length)
+
+    data = make_sample_application('raster')
+    del data['signature_base64']
+    for key, value in list(data.items()):
+        if isinstance(value, str):
+            data[key] = text()
+    data['positions'] = {
+        key: True for key in (
+            'wpc_cashier', 'wpc_greenhouse', 'wpc_nursery', 'wpc_waterer', 'wpc_admin',
+            'land_designer', 'land_foreman', 'land_installer', 'cafe_foh', 'cafe_boh', 'cafe_admin', 'other',
+        )
+    }
+    data['positions']['other_description'] = text()
+    data['employers'] = [
+        {key: text() for key in ('employer', 'location', 'hire_date', 'end_date', 'position', 'pay_rate', 'reason')}
+        for _ in range(3)
+    ]
+    data['references'] = [
+        {key: text() for key in ('name', 'contact', 'relationship')}
+        for _ in range(3)
+    ]
+
+    if signature == 'vector':
+        data['signature_strokes'] = make_synthetic_strokes(rng)
+        data['signature_size'] = [400, 133]
+    elif signature == 'raster':
+        data['signature_base64'] = make_signature_base64()
+    return data
+
+
+# Messy input as it arrives from phones and copy-pasted resumes
+SANITIZE_CORPUS = [
+    "Jordan O\u2019Brien",
+    "\u201cPeople person\u201d \u2013 always on time \u2014 really\u2026",
+    "Caf\u00e9 & Bistro (Downtown): line cook",
+    "Jos\u00e9 Mar\u00eda N\u0303u\u0301\u00f1ez",
+    "\u202bRTL embedded\u202c text \u200fwith marks\u200e and \u202eoverride\u202c",
+    "zero\u200bwidth\u200cjoin\u200dchars\ufeff",
+    "I love plants \U0001F331\U0001F33B and people \U0001F469\u200d\U0001F33E!",
+    "\U0001F44D\U0001F3FD thumbs",
+    "line one\r\nline two\nline three\r",
+    "  tabs\tand   runs   of  spaces  ",
+    "\uff26\uff55\uff4c\uff4c\uff57\uff49\uff44\uff54\uff48 \uff11\uff12\uff13",
+    "\ufb01rst \ufb02oor, \u2460 \u00bd \u2122 \u00b2",
+    "\u0645\u0631\u062d\u0628\u0627 \u05e9\u05dc\u05d5\u05dd \u4f60\u597d \u3053\u3093\u306b\u3061\u306f",
+    "C:\\Users\\jordan\\resume.docx",
+    "\u00a0non-breaking\u00a0spaces\u2003em\u2009thin",
+    "\u2018single\u2019 \u201cdouble\u201d \u201elow\u201c \u00abguillemets\u00bb",
+    "\x00nul\x00 and \x1fcontrol\x7f chars",
+    "$15/hour \u2013 negotiable \u20ac12 \u00a310",
+    "\u2019" * 600,
+    "very long answer " * 60,
+    "",
+    12345,
+    None,
+    3.5,
+]
+
+
+def legacy_sanitize_for_pdf(value):
+    """The original replace-loop sanitizer, kept as the reference output"""
+    if not isinstance(value, str):
+        value = str(value)
+    value = unicodedata.normalize('NFKD', value)
+    replacements = {
+        '\u2019': "'", '\u2018': "'", '\u201c': '"', '\u201d': '"',
+        '\u2013': '-', '\u2014': '-', '\u2026': '...',
+        '\u202c': '', '\u202a': '', '\u202b': '',
+        '\u200b': '', '\u200c': '', '\u200d': '', '\ufeff': '',
+        # The original dict also held garbled copies of the quotes above;
+        # two of them had merged into this one multi-character key
+        ': "\'",\n    ': "'",
+        '(': '[', ')': ']', '&': 'and', ':': '-', '\\': '/',
+    }
+    for old, new in replacements.items():
+        value = value.replace(old, new)
+    value = value.replace('\n', ' / ').replace('\r', '')
+    value = value.encode('ascii', 'ignore').decode('ascii')
+    value = ' '.join(value.split())
+    if len(value) > 500:
+        value = value[:497] + "..."
+    return value.strip()
+
+
+def make_fuzz_corpus(count, seed=8):
+    """Random strings mixing ASCII with the characters the sanitizer handles"""
+    rng = random.Random(seed)
+    alphabet = (
+        list("abcXYZ 019.,-'\"()&:\\/\n\r\t")
+        + list(generator._PDF_REPLACEMENTS)
+        + ['\u00e9', '\u0301', '\u00a0', '\u200f', '\u202e', '\uff21', '\ufb01', '\u4f60', '\U0001F331', '\x00']
+    )
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 80))) for _ in range(count)]
+
+
+# ------------------------------------------------------------------ #
+# HELPERS
+# ------------------------------------------------------------------ #
+def time_call(func, *args, **kwargs):
+    """Run func with its progress output silenced; return (seconds, result)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+    return elapsed, result
+
+
+def summarize_ms(samples):
+    """Mean / median / min of a list of durations in seconds, as ms"""
+    return {
+        'mean': statistics.mean(samples) * 1000,
+        'median': statistics.median(samples) * 1000,
+        'min': min(samples) * 1000,
+    }
+
+
+def percentiles_ms(samples):
+    """p50 / p95 / p99 (plus mean, min, max) of durations in seconds, as ms"""
+    if len(samples) > 1:
+        cuts = statistics.quantiles(samples, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = samples[0]
+    return {
+        'p50': p50 * 1000,
+        'p95': p95 * 1000,
+        'p99': p99 * 1000,
+        'mean': statistics.mean(samples) * 1000,
+        'min': min(samples) * 1000,
+        'max': max(samples) * 1000,
+    }
+
+
+def max_rss_mb():
+    """Process high-water resident memory in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def file_sha256(path):
+    """SHA-256 of a file, or None if it is missing"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def git_revision():
+    """Current commit of the working tree, if this is a git checkout"""
+    import subprocess
+
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def progress(message):
+    """Suite progress goes to stderr; stdout is silenced while measuring"""
+    print(message, file=sys.stderr, flush=True)
+
+
+# ------------------------------------------------------------------ #
+# BENCHMARKS
+# ------------------------------------------------------------------ #
+def bench_engines(runs, signature):
+    """Compare every fill engine on the same applicant"""
+    data = make_sample_application(signature)
+
+    print(f"Fill engines, {runs} runs each, {signature} signature (template parse excluded by warm-up)")
+    print(f"{'engine':<10} {'mean ms':>9} {'median ms':>10} {'min ms':>8} {'size KB':>8}")
+    for engine in generator.PDF_ENGINES:
+        # Warm-up populates the per-process template cache
+        _, pdf_buffer = time_call(generator.generate_application_pdf, data, engine=engine)
+        if pdf_buffer is None:
+            print(f"{engine:<10} failed (run without the benchmark to see the error)")
+            continue
+
+        samples = [time_call(generator.generate_application_pdf, data, engine=engine)[0] for _ in range(runs)]
+        stats = summarize_ms(samples)
+        size_kb = len(pdf_buffer.getvalue()) / 1024
+        print(f"{engine:<10} {stats['mean']:>9.1f} {stats['median']:>10.1f} {stats['min']:>8.1f} {size_kb:>8.1f}")
+
+
+def bench_sanitize(runs):
+    """Check the table-driven sanitizer matches the original, then time it"""
+    corpus = SANITIZE_CORPUS + make_fuzz_corpus(2000)
+    fields = {f"field{i}": value for i, value in enumerate(corpus)}
+    expected = {name: legacy_sanitize_for_pdf(value) for name, value in fields.items()}
+
+    mismatches = [name for name, value in fields.items() if generator.sanitize_for_pdf(value) != expected[name]]
+    bulk = generator.sanitize_fields(fields)
+    mismatches += [name for name in fields if bulk[name] != expected[name]]
+    print(f"Equivalence on {len(corpus)} inputs: {'OK' if not mismatches else f'{len(mismatches)} MISMATCHES'}")
+    for name in mismatches[:10]:
+        print(f"  {name}: {fields[name]!r} -> {expected[name]!r}")
+
+    # Time on a realistic submission (60+ mostly short ASCII fields)
+    application = generator.build_pdf_field_values(make_sample_application())
+    application['why_applying'] = SANITIZE_CORPUS[1] + " " + SANITIZE_CORPUS[6]
+    application['first_name'] = SANITIZE_CORPUS[0]
+
+    variants = [
+        ('legacy', lambda: {k: legacy_sanitize_for_pdf(v) for k, v in application.items()}),
+        ('per-field', lambda: {k: generator.sanitize_for_pdf(v) for k, v in application.items()}),
+        ('bulk', lambda: generator.sanitize_fields(application)),
+    ]
+    print(f"\nOne application ({len(application)} fields), {runs} runs each")
+    print(f"{'sanitizer':<10} {'mean us':>9} {'median us':>10} {'min us':>8}")
+    for label, func in variants:
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        stats = summarize_ms(samples)
+        print(f"{label:<10} {stats['mean'] * 1000:>9.1f} {stats['median'] * 1000:>10.1f} {stats['min'] * 1000:>8.1f}")
+
+    return not mismatches
+
+
+def bench_profiles(runs, engine, signature):
+    """Compare every output profile on the same rendered applicant"""
+    data = make_sample_application(signature)
+    pdf_data = generator.build_pdf_field_values(data)
+    signature_data = generator.get_signature(data)
+    render = {
+        'overlay': generator._render_with_overlay,
+        'pymupdf': generator._render_with_pymupdf,
+        'pdfrw': generator._render_with_pdfrw,
+    }[engine]
+
+    print(f"Output profiles, {runs} runs each, {engine} engine, {signature} signature (save time only)")
+    print(f"{'profile':<10} {'size KB':>8} {'vs fast':>8} {'mean ms':>8} {'median ms':>10} {'min ms':>7}")
+    baseline = None
+    for profile in generator.PDF_OUTPUT_PROFILES:
+        samples = []
+        for _ in range(runs + 1):
+            _, doc = time_call(render, pdf_data, signature_data, generator.resolve_template()['path'])
+            _, (output_buffer, stats) = time_call(generator.save_pdf, doc, profile)
+            doc.close()
+            samples.append(stats['seconds'])
+        # The first save also pays one-off costs (e.g. the linearization check)
+        timing = summarize_ms(samples[1:])
+        if baseline is None:
+            baseline = stats['size']
+        change = (stats['size'] - baseline) / baseline * 100
+        print(f"{profile:<10} {stats['size'] / 1024:>8.1f} {change:>+7.1f}% "
+              f"{timing['mean']:>8.1f} {timing['median']:>10.1f} {timing['min']:>7.1f}")
+
+
+def suite_single(data, runs, engine, profile):
+    """Sequential calls to generate_application_pdf(): wall, CPU, size, memory"""
+    # Warm-up fills the template cache
+    if generator.generate_application_pdf(data, engine, profile) is None:
+        raise RuntimeError("PDF generation failed (run without the benchmark to see the error)")
+
+    wall, cpu, sizes = [], [], []
+    for _ in range(runs):
+        start, cpu_start = time.perf_counter(), time.process_time()
+        pdf_buffer = generator.generate_application_pdf(data, engine, profile)
+        wall.append(time.perf_counter() - start)
+        cpu.append(time.process_time() - cpu_start)
+        sizes.append(len(pdf_buffer.getvalue()))
+
+    # Python-heap peak per call, measured separately because tracing slows
+    # everything down; allocations inside MuPDF itself are not traced
+    peaks = []
+    for _ in range(min(runs, 3)):
+        tracemalloc.start()
+        generator.generate_application_pdf(data, engine, profile)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        'calls': runs,
+        'wall_ms': percentiles_ms(wall),
+        'cpu_ms': percentiles_ms(cpu),
+        'size_bytes': {'min': min(sizes), 'max': max(sizes)},
+        'python_peak_kb': max(peaks) / 1024,
+    }
+
+
+def suite_concurrent(data, calls, concurrency, mode, engine, profile):
+    """
+    calls renders from concurrency caller threads
+
+    mode "pool" submits to the application_pdf_pool worker processes, as
+    the app does; "threads" calls generate_application_pdf() in each thread.
+    """
+    lock = threading.Lock()
+    wall, cpu, sizes, failures = [], [], [], []
+    remaining = [calls]
+
+    pool = pdf_pool.get_pdf_pool() if mode == 'pool' else None
+    if mode == 'pool' and pool is None:
+        raise RuntimeError("PDF process pool is disabled (PDF_WORKERS=0); use --mode threads")
+
+    def caller():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            if pool is not None:
+                request = pdf_pool.build_pdf_request(data, engine, profile)
+                response = pool.submit(pdf_pool.render_pdf_request, request).result()
+                pdf_bytes, cpu_used = response['pdf_bytes'], response['cpu']
+            else:
+                cpu_start = time.thread_time()
+                pdf_buffer = generator.generate_application_pdf(data, engine, profile)
+                pdf_bytes = pdf_buffer.getvalue() if pdf_buffer else None
+                cpu_used = time.thread_time() - cpu_start
+            elapsed = time.perf_counter() - start
+            with lock:
+                if pdf_bytes:
+                    wall.append(elapsed)
+                    cpu.append(cpu_used)
+                    sizes.append(len(pdf_bytes))
+                else:
+                    failures.append(elapsed)
+
+    # Warm-up: one render per worker/thread so template caches are filled
+    if pool is not None:
+        warm_up = pdf_pool.build_pdf_request(data, engine, profile)
+        for future in [pool.submit(pdf_pool.render_pdf_request, warm_up) for _ in range(pdf_pool.PDF_WORKERS * 2)]:
+            future.result()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=caller) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'calls': calls,
+        'concurrency': concurrency,
+        'mode': mode,
+        'workers': pdf_pool.PDF_WORKERS if mode == 'pool' else None,
+        'failures': len(failures),
+        'elapsed_s': elapsed,
+        'throughput_per_s': len(wall) / elapsed if elapsed else None,
+    }
+    if wall:
+        result.update({
+            'wall_ms': percentiles_ms(wall),
+            'cpu_ms': percentiles_ms(cpu),
+            'size_bytes': {'min': min(sizes), 'max': max(sizes)},
+        })
+    return result
+
+
+def print_suite(results):
+    """Human-readable table of a suite result"""
+    meta = results['meta']
+    print(f"PDF suite: engine={meta['engine']} profile={meta['profile']} "
+          f"pymupdf={meta['pymupdf']} python={meta['python']} commit={meta['commit']}")
+    print(f"{'signature':<10} {'run':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'cpu p50':>8} {'size KB':>8} {'py peak KB':>11} {'per s':>7}")
+    for signature, runs in results['results'].items():
+        for label, run in (('single', runs['single']), (f"x{runs['concurrent']['concurrency']} {runs['concurrent']['mode']}", runs['concurrent'])):
+            if 'wall_ms' not in run:
+                print(f"{signature:<10} {label:<12} all {run['calls']} calls failed")
+                continue
+            peak = f"{run['python_peak_kb']:.0f}" if 'python_peak_kb' in run else '-'
+            per_second = f"{run['throughput_per_s']:.1f}" if 'throughput_per_s' in run else '-'
+            print(f"{signature:<10} {label:<12} {run['wall_ms']['p50']:>8.1f} {run['wall_ms']['p95']:>8.1f} "
+                  f"{run['wall_ms']['p99']:>8.1f} {run['cpu_ms']['p50']:>8.1f} "
+                  f"{run['size_bytes']['max'] / 1024:>8.1f} {peak:>11} {per_second:>7}")
+    print(f"Process max RSS: {meta['max_rss_mb']:.0f} MB" if meta['max_rss_mb'] else "Process max RSS: n/a")
+
+
+def print_comparison(results, baseline):
+    """p50/p95 wall time and size change against an earlier suite JSON"""
+    print(f"\nChange vs {baseline['meta'].get('timestamp')} (commit {baseline['meta'].get('commit')})")
+    for signature, runs in results['results'].items():
+        for run_name in ('single', 'concurrent'):
+            old = baseline['results'].get(signature, {}).get(run_name)
+            new = runs[run_name]
+            if not old or 'wall_ms' not in old or 'wall_ms' not in new:
+                continue
+            changes = [
+                f"{key} {(new['wall_ms'][key] - old['wall_ms'][key]) / old['wall_ms'][key] * 100:+.1f}%"
+                for key in ('p50', 'p95')
+            ]
+            size_change = (new['size_bytes']['max'] - old['size_bytes']['max']) / old['size_bytes']['max'] * 100
+            print(f"  {signature:<10} {run_name:<10} {', '.join(changes)}, size {size_change:+.1f}%")
+
+
+def bench_suite(args):
+    """Run the synthetic-applicant suite and save the results as JSON"""
+    import fitz
+
+    engine = (args.engine or generator.PDF_ENGINE).lower()
+    profile = (args.profile or generator.PDF_OUTPUT_PROFILE).lower()
+    if args.workers is not None:
+        pdf_pool.PDF_WORKERS = args.workers
+
+    results = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': git_revision(),
+            'engine': engine,
+            'profile': profile,
+            'template': generator.resolve_template()['id'],
+            'template_sha256': file_sha256(generator.resolve_template()['path']),
+            'pymupdf': fitz.VersionBind,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'runs': args.runs,
+            'concurrent_calls': args.calls or args.runs,
+        },
+        'results': {},
+    }
+
+    try:
+        # The generator logs every step; keep the measurements quiet
+        with pdf_pool.silenced_stdout():
+            for signature in SUITE_SIGNATURES:
+                data = make_synthetic_application(signature)
+                progress(f"{signature}: {args.runs} single-threaded runs...")
+                single = suite_single(data, args.runs, engine, profile)
+                progress(f"{signature}: {args.calls or args.runs} calls from {args.concurrency} {args.mode} callers...")
+                concurrent = suite_concurrent(data, args.calls or args.runs, args.concurrency, args.mode, engine, profile)
+                results['results'][signature] = {'single': single, 'concurrent': concurrent}
+    finally:
+        pdf_pool.shutdown_pdf_pool()
+
+    results['meta']['max_rss_mb'] = max_rss_mb()
+    print_suite(results)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print_comparison(results, json.load(f))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"\nResults saved to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for application_pdf_generator")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    engines = subparsers.add_parser('engines', help="compare PDF fill engines")
+    engines.add_argument('--runs', type=int, default=20)
+    engines.add_argument('--signature', choices=['raster', 'vector'], default='raster')
+
+    sanitize = subparsers.add_parser('sanitize', help="check and time the field sanitizer")
+    sanitize.add_argument('--runs', type=int, default=200)
+
+    profiles = subparsers.add_parser('profiles', help="compare PDF output profiles")
+    profiles.add_argument('--runs', type=int, default=10)
+    profiles.add_argument('--engine', choices=generator.PDF_ENGINES, default=generator.PDF_ENGINE)
+    profiles.add_argument('--signature', choices=['raster', 'vector'], default='raster')
+
+    suite = subparsers.add_parser('suite', help="synthetic-applicant benchmark suite with JSON output")
+    suite.add_argument('--runs', type=int, default=50, help="single-threaded calls per signature variant")
+    suite.add_argument('--calls', type=int, help="concurrent calls per variant (default: --runs)")
+    suite.add_argument('--concurrency', type=int, default=4, help="number of concurrent callers")
+    suite.add_argument('--mode', choices=['pool', 'threads'], default='pool',
+                       help="concurrent callers use the worker process pool or call in-process")
+    suite.add_argument('--workers', type=int, help="pool size for --mode pool (default: PDF_WORKERS)")
+    suite.add_argument('--engine', choices=generator.PDF_ENGINES)
+    suite.add_argument('--profile', choices=list(generator.PDF_OUTPUT_PROFILES))
+    suite.add_argument('--output', help="write results to this JSON file")
+    suite.add_argument('--compare', help="earlier results JSON to compare against")
+
+    args = parser.parse_args()
+    if args.command == 'engines':
+        bench_engines(args.runs, args.signature)
+    elif args.command == 'profiles':
+        bench_profiles(args.runs, args.engine, args.signature)
+    elif args.command == 'suite':
+        bench_suite(args)
+    elif args.command == 'sanitize':
+        if not bench_sanitize(args.runs):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
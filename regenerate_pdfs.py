@@ -0,0 +1,435 @@
+# regenerate_pdfs.py
+# Bulk regeneration of application PDFs
+#
+# USAGE:
+#   python regenerate_pdfs.py applications.json --output-dir regenerated/
+#   python regenerate_pdfs.py sheet_export.csv --output-dir regenerated/ [--workers 4]
+#   python regenerate_pdfs.py --from-sheet --upload [--batch-size 20] [--report report.json]
+#
+# After a template or sanitizer fix, past applicants' PDFs can be rebuilt in
+# one run instead of one browser submission at a time.  Records are rendered
+# across a process pool (one worker per CPU core by default) and written to a
+# directory and/or uploaded to the Drive PDF folder in batches, while the
+# next PDFs render.
+#
+# Input:
+#   .json   a list of application dicts (the data the app builds), or
+#           {"applications": [...]}
+#   .jsonl  one application dict per line
+#   .csv    a download of the applications worksheet (File > Download > CSV),
+#           i.e. the rows send_application_to_sheet() writes
+#   --from-sheet reads the same rows from the live worksheet (needs the app's
+#           secrets, like the app itself)
+#
+# Sheet rows carry no signature and no schedule preference, so PDFs rebuilt
+# from them leave those blank; use a JSON export when they matter.
+#
+# Each record is rendered with the template recorded with it (the sheet's
+# PDF template column / "pdf_template"), or the default one for older
+# records; --template renders them all with another registered template.
+#
+# Records rendered on an earlier run are served from application_pdf_cache
+# when PDF_CACHE_DIR is set.  The exit status is 1 if any record failed.
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import application_pdf_generator as generator
+import application_pdf_pool as pdf_pool
+from application_api_limiter import get_api_limiter_stats
+from application_pdf_cache import get_cached_pdf, pdf_cache_key, store_pdf
+from application_sheet_columns import SHEET_COLUMNS, normalize_header, row_to_record, sheet_record_to_application
+
+# Longest file name stem written to --output-dir, in UTF-8 bytes (filesystems allow 255)
+MAX_FILENAME_BYTES = 200
+
+# Progress is reported at most this often (seconds)
+PROGRESS_INTERVAL = 2.0
+
+
+# ------------------------------------------------------------------ #
+# READING RECORDS
+# ------------------------------------------------------------------ #
+def sheet_rows_to_applications(rows):
+    """
+    Convert worksheet rows to application data
+
+    Columns are matched by the header row when there is one; rows without
+    one are taken to be in the standard SHEET_COLUMNS order.
+    """
+    rows = [row for row in rows if any(cell.strip() for cell in row)]
+    headers = None
+    if rows:
+        standard = {normalize_header(header) for header in SHEET_COLUMNS}
+        if sum(normalize_header(cell) in standard for cell in rows[0]) > len(SHEET_COLUMNS) // 2:
+            headers, rows = rows[0], rows[1:]
+    return [sheet_record_to_application(row_to_record(row, headers)) for row in rows]
+
+
+def load_records(path):
+    """
+    Read application records from a JSON, JSON lines or sheet CSV export
+
+    Returns:
+        tuple: (list of application dicts, True if they came from sheet rows)
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".csv":
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return sheet_rows_to_applications(csv.reader(f)), True
+
+    with open(path, encoding='utf-8') as f:
+        if extension == ".jsonl":
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = json.load(f)
+
+    if isinstance(records, dict):
+        records = records.get('applications', [records])
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError(f"{path}: expected application objects")
+    return records, False
+
+
+def load_sheet_records():
+    """Read every applicant row from the live worksheet and its shards"""
+    # Lazy import - needs Streamlit, gspread and the app's secrets
+    from application_sheets_manager import read_sheet_records
+
+    return [sheet_record_to_application(record) for _, record in read_sheet_records()]
+
+
+def pdf_filename(data):
+    """Same name the app gives the PDF"""
+    return f"{data.get('first_name', 'Applicant')} {data.get('last_name', '')} Application.pdf"
+
+
+def applicant_name(data):
+    name = f"{data.get('first_name', '')} {data.get('last_name', '')}".strip() or "(no name)"
+    return name if len(name) <= 60 else name[:57] + "..."
+
+
+# ------------------------------------------------------------------ #
+# RENDERING
+# ------------------------------------------------------------------ #
+def iter_rendered(records, engine, profile, template=None):
+    """
+    Render records across the process pool, keeping a bounded number in flight
+
+    Yields:
+        tuple: (index, pdf bytes or None, source 'cache'/'rendered', error message)
+        in completion order
+    """
+    from concurrent.futures.process import BrokenProcessPool
+
+    pool = pdf_pool.get_pdf_pool()
+    window = max(1, pdf_pool.PDF_WORKERS) * 2
+    pending = {}
+
+    def finish(index, key, response):
+        if not response['pdf_bytes']:
+            return index, None, 'rendered', "PDF generation failed (rerun with --verbose for the generator log)"
+        store_pdf(key, response['pdf_bytes'])
+        return index, response['pdf_bytes'], 'rendered', None
+
+    def collect(block):
+        nonlocal pool
+        if block:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        else:
+            done = [future for future in pending if future.done()]
+        for future in done:
+            index, request, key = pending.pop(future)
+            try:
+                response = future.result()
+            except BrokenProcessPool as e:
+                # A worker died; finish this run in-process
+                print(f">>> WARNING: PDF process pool broke, rendering in-process: {e}", file=sys.stderr)
+                pdf_pool.shutdown_pdf_pool()
+                pool = None
+                response = pdf_pool.render_pdf_request(request)
+            yield finish(index, key, response)
+
+    for index, data in enumerate(records):
+        try:
+            request = pdf_pool.build_pdf_request(data, engine, profile, template)
+            key = pdf_cache_key(request)
+        except Exception as e:
+            yield index, None, 'rendered', f"Bad record: {e}"
+            continue
+
+        cached = get_cached_pdf(key)
+        if cached:
+            yield index, cached, 'cache', None
+            continue
+
+        if pool is None:
+            yield finish(index, key, pdf_pool.render_pdf_request(request))
+            continue
+
+        pending[pool.submit(pdf_pool.render_pdf_request, request)] = (index, request, key)
+        yield from collect(block=len(pending) >= window)
+
+    while pending:
+        yield from collect(block=True)
+
+
+# ------------------------------------------------------------------ #
+# OUTPUT
+# ------------------------------------------------------------------ #
+def write_pdf(output_dir, filename, pdf_bytes, taken):
+    """Write into output_dir, numbering duplicate applicant names"""
+    stem, extension = os.path.splitext(filename)
+    stem = re.sub(r'[\\/:*?"<>|]+', "_", stem)
+    stem = stem.encode('utf-8')[:MAX_FILENAME_BYTES].decode('utf-8', 'ignore').strip() or "Applicant"
+    name = f"{stem}{extension}"
+    count = 1
+    while name.lower() in taken:
+        count += 1
+        name = f"{stem} ({count}){extension}"
+    taken.add(name.lower())
+
+    path = os.path.join(output_dir, name)
+    with open(path, "wb") as f:
+        f.write(pdf_bytes)
+    return path
+
+
+def upload_batch(batch):
+    """
+    Upload one batch to the Drive PDF folder, one file after another
+
+    Batches go through a single upload thread while rendering continues;
+    files go to the subfolder the app would use (DRIVE_FOLDER_SHARDING).
+
+    Returns:
+        list: (index, link or "", seconds) per file
+    """
+    import io
+
+    from application_sheets_manager import drive_folder_name, upload_pdf_to_drive
+
+    results = []
+    for index, filename, pdf_bytes, data in batch:
+        start = time.perf_counter()
+        link = upload_pdf_to_drive(io.BytesIO(pdf_bytes), filename, folder=drive_folder_name(data))
+        results.append((index, link, time.perf_counter() - start))
+    return results
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+
+# ------------------------------------------------------------------ #
+# MAIN
+# ------------------------------------------------------------------ #
+def regenerate(records, args):
+    """
+    Render, write and upload every record
+
+    Returns:
+        tuple: (list of per-record report dicts, stats dict)
+    """
+    total = len(records)
+    report = [
+        {'index': index, 'name': applicant_name(data), 'filename': pdf_filename(data), 'status': 'pending'}
+        for index, data in enumerate(records)
+    ]
+    stats = {'rendered': 0, 'cached': 0, 'written': 0, 'uploaded': 0, 'failed': 0,
+             'bytes': 0, 'upload_seconds': 0.0, 'upload_bytes': 0}
+    taken = set()
+    start = time.perf_counter()
+    last_progress = 0.0
+    processed = 0
+
+    def fail(index, stage, error):
+        if report[index]['status'] != 'failed':
+            stats['failed'] += 1
+        report[index].update(status='failed', stage=stage, error=error)
+
+    def record_uploads(future, indexes):
+        try:
+            results = future.result()
+        except Exception as e:
+            print(traceback.format_exc(), file=sys.stderr)
+            for index in indexes:
+                fail(index, 'upload', f"Upload batch failed: {e}")
+            return
+        for index, link, seconds in results:
+            stats['upload_seconds'] += seconds
+            if link:
+                stats['uploaded'] += 1
+                stats['upload_bytes'] += report[index]['size']
+                report[index]['link'] = link
+            else:
+                fail(index, 'upload', "Upload to Drive failed")
+
+    uploader = ThreadPoolExecutor(max_workers=1) if args.upload else None
+    uploads = deque()
+    batch = []
+
+    def flush_batch():
+        nonlocal batch
+        if not batch:
+            return
+        # At most two batches queued, so memory stays bounded when Drive is slow
+        while len(uploads) >= 2:
+            record_uploads(*uploads.popleft())
+        uploads.append((uploader.submit(upload_batch, batch), [entry[0] for entry in batch]))
+        batch = []
+
+    try:
+        for index, pdf_bytes, source, error in iter_rendered(records, args.engine, args.profile, args.template):
+            processed += 1
+            if error:
+                fail(index, 'render', error)
+            else:
+                stats['cached' if source == 'cache' else 'rendered'] += 1
+                stats['bytes'] += len(pdf_bytes)
+                report[index].update(status='ok', source=source, size=len(pdf_bytes))
+
+                if args.output_dir:
+                    try:
+                        report[index]['path'] = write_pdf(args.output_dir, report[index]['filename'], pdf_bytes, taken)
+                        stats['written'] += 1
+                    except OSError as e:
+                        fail(index, 'write', str(e))
+
+                if uploader:
+                    batch.append((index, report[index]['filename'], pdf_bytes, records[index]))
+                    if len(batch) >= args.batch_size:
+                        flush_batch()
+
+            now = time.perf_counter()
+            if processed == total or now - last_progress >= PROGRESS_INTERVAL:
+                last_progress = now
+                elapsed = now - start
+                rate = processed / elapsed if elapsed else 0.0
+                eta = (total - processed) / rate if rate else None
+                print(
+                    f"[{processed:>{len(str(total))}}/{total} {processed / total:4.0%}] "
+                    f"{rate:.1f} PDFs/s, ETA {format_eta(eta)}, {stats['failed']} failed",
+                    file=sys.stderr, flush=True,
+                )
+
+        if uploader:
+            flush_batch()
+            while uploads:
+                record_uploads(*uploads.popleft())
+                print(f"Uploaded {stats['uploaded']} PDFs", file=sys.stderr, flush=True)
+    finally:
+        if uploader:
+            uploader.shutdown(wait=True, cancel_futures=True)
+
+    stats['seconds'] = time.perf_counter() - start
+    return report, stats
+
+
+def print_summary(report, stats, args):
+    seconds = stats['seconds']
+    total = len(report)
+    print(f"\nRegenerated {total - stats['failed']}/{total} application PDFs "
+          f"in {seconds:.1f}s ({total / seconds if seconds else 0:.1f} PDFs/s, "
+          f"{pdf_pool.PDF_WORKERS or 'no'} worker processes)")
+    print(f"  Rendered:   {stats['rendered']}")
+    print(f"  From cache: {stats['cached']}")
+    print(f"  Total size: {stats['bytes'] / (1024 * 1024):.1f} MB")
+    if args.output_dir:
+        print(f"  Written:    {stats['written']} to {args.output_dir}")
+    if args.upload:
+        upload_rate = stats['upload_bytes'] / stats['upload_seconds'] / (1024 * 1024) if stats['upload_seconds'] else 0
+        print(f"  Uploaded:   {stats['uploaded']} ({upload_rate:.2f} MB/s)")
+        drive = get_api_limiter_stats().get('drive')
+        if drive:
+            print(f"  Drive rate limit: waited {drive['wait_seconds']:.1f}s over {drive['waits']} calls, "
+                  f"{drive['retries']} retries, {drive['rejected']} rejected")
+    print(f"  Failed:     {stats['failed']}")
+
+    failures = [entry for entry in report if entry['status'] == 'failed']
+    for entry in failures[:10]:
+        print(f"    #{entry['index']} {entry['name']}: {entry['stage']}: {entry['error']}")
+    if len(failures) > 10:
+        print(f"    ... and {len(failures) - 10} more" + ("" if args.report else " (use --report for the full list)"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate application PDFs in bulk")
+    parser.add_argument('input', nargs='?', help="JSON, JSON lines or worksheet CSV export")
+    parser.add_argument('--from-sheet', action='store_true', help="read the rows from the live worksheet")
+    parser.add_argument('--output-dir', help="write the PDFs to this directory")
+    parser.add_argument('--upload', action='store_true', help="upload the PDFs to the Drive PDF folder")
+    parser.add_argument('--batch-size', type=int, default=20, help="PDFs per upload batch")
+    parser.add_argument('--workers', type=int, help="render processes (default: one per CPU core, 0 = in-process)")
+    parser.add_argument('--engine', choices=generator.PDF_ENGINES)
+    parser.add_argument('--profile', choices=list(generator.PDF_OUTPUT_PROFILES))
+    parser.add_argument('--template', help="template id (event/year/vN) for every record "
+                                           "(default: the one recorded with each application)")
+    parser.add_argument('--limit', type=int, help="only the first N records (for a trial run)")
+    parser.add_argument('--report', help="write a per-record JSON report (paths, links, errors)")
+    parser.add_argument('--verbose', action='store_true', help="show the generator's log")
+    args = parser.parse_args()
+
+    if bool(args.input) == args.from_sheet:
+        parser.error("give an input file or --from-sheet (not both)")
+    if not args.output_dir and not args.upload:
+        parser.error("nothing to do: give --output-dir and/or --upload")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+
+    try:
+        records, from_sheet = (load_sheet_records(), True) if args.from_sheet else load_records(args.input)
+    except Exception as e:
+        print(f"ERROR: Could not read application records: {e}", file=sys.stderr)
+        print(traceback.format_exc(), file=sys.stderr)
+        raise SystemExit(2)
+
+    if args.limit is not None:
+        records = records[:args.limit]
+    if not records:
+        print("No application records found")
+        return
+    if from_sheet:
+        print("Note: sheet rows have no signature or schedule preference; those are left blank", file=sys.stderr)
+
+    pdf_pool.PDF_WORKERS = (os.cpu_count() or 1) if args.workers is None else args.workers
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    print(f"Regenerating {len(records)} application PDFs with {pdf_pool.PDF_WORKERS or 'no'} worker processes...",
+          file=sys.stderr)
+    try:
+        if args.verbose:
+            report, stats = regenerate(records, args)
+        else:
+            with pdf_pool.silenced_stdout():
+                report, stats = regenerate(records, args)
+    finally:
+        pdf_pool.shutdown_pdf_pool()
+
+    print_summary(report, stats, args)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'stats': stats, 'records': report}, f, indent=2)
+            f.write("\n")
+        print(f"\nReport saved to {args.report}")
+
+    if stats['failed']:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()